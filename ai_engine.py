@@ -1,8 +1,11 @@
 import os
+import re
+import random
 import json
 import time
 import threading
 import requests
+from functools import lru_cache
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -10,6 +13,20 @@ load_dotenv()
 import warnings
 warnings.filterwarnings("ignore")
 
+# optional fast JSON decoder — orjson parses the string-heavy LLM
+# response bodies several times faster than stdlib json. both accept
+# raw bytes, so response bodies skip requests' extra text decode.
+# falls back silently, outputs are identical for our payloads.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
 
 # ============================================================
 # PROVIDER CONFIGURATION
@@ -49,6 +66,15 @@ PROVIDER_URLS = {
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+# how long ollama keeps the model resident between calls
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "10m")
+
+# optional CPU thread pinning — ollama's default grabs all cores, which
+# oversubscribes the box while scrape/extraction workers are running on
+# the same machine. 0/unset = leave it to ollama.
+_num_threads = os.getenv("OLLAMA_NUM_THREADS", "").strip()
+OLLAMA_NUM_THREADS = int(_num_threads) if _num_threads.isdigit() else 0
+
 # user-selected ollama model (None = auto-pick first available)
 _active_ollama_model = os.getenv("OLLAMA_MODEL", "").strip() or None
 
@@ -65,6 +91,21 @@ for _prov, _prefix in _PROVIDER_PREFIX.items():
 MAX_RETRIES = 3
 RETRY_DELAYS = [2, 5, 10]
 
+# shared HTTP session — keeps provider connections alive so repeat
+# calls skip the TCP + TLS handshake instead of paying it per request.
+# the adapter pool is sized for concurrent classification batches plus
+# the ollama endpoint without evicting warm connections. max_retries only
+# covers DNS/connect failures (never requests that reached the server),
+# so a dropped keepalive connection is redialed transparently instead of
+# burning one of the slower application-level retry rounds.
+_http = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=2)
+_http.mount("https://", _adapter)
+_http.mount("http://", _adapter)
+
+import atexit
+atexit.register(_http.close)
+
 # per-stage output token caps
 STAGE_MAX_TOKENS = {
     "refine":        512,
@@ -78,6 +119,19 @@ STAGE_MAX_TOKENS = {
 # stages that output JSON
 STAGE_JSON_MODE = {"classify", "file_analysis", "company_check"}
 
+# pages per classification LLM call — larger batches amortize per-call
+# latency but increase the risk of truncated JSON on long outputs
+CLASSIFY_BATCH_SIZE = max(1, int(os.getenv("CLASSIFY_BATCH_SIZE", "6")))
+
+# pages with less cleaned content than this are classified low-signal
+# without an LLM round trip — there is nothing to base a verdict on
+CLASSIFY_MIN_CHARS = max(0, int(os.getenv("CLASSIFY_MIN_CHARS", "80")))
+
+# classification batches in flight at once against cloud providers —
+# the calls are independent and network-bound, so a little overlap cuts
+# stage wall time without hammering the rate limits
+CLASSIFY_CONCURRENCY = max(1, int(os.getenv("CLASSIFY_CONCURRENCY", "2")))
+
 # per-key rate limit tracking
 _key_state = {}
 
@@ -119,9 +173,9 @@ def get_ollama_model_name() -> str:
 def list_ollama_models() -> list:
     """list all models available in the local ollama instance"""
     try:
-        r = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
+        r = _http.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
         if r.status_code == 200:
-            models = r.json().get("models", [])
+            models = _json_loads(r.content).get("models", [])
             return [m.get("name", "") for m in models if m.get("name")]
     except Exception:
         pass
@@ -137,21 +191,11 @@ def _get_provider_key(provider: str, stage: str) -> str:
     if not keys:
         return None
 
-    # try stage-specific key first
-    candidates = []
-    stage_key = keys.get(stage)
-    if stage_key:
-        candidates.append(stage_key)
-
-    # try refine key as fallback
-    refine_key = keys.get("refine")
-    if refine_key and refine_key not in candidates:
-        candidates.append(refine_key)
-
-    # try any other key
-    for other_stage, other_key in keys.items():
-        if other_key and other_key not in candidates:
-            candidates.append(other_key)
+    # ordered candidate chain with dict-based dedup — this runs on
+    # every LLM call, no need to rescan a list per key
+    candidates = dict.fromkeys(
+        k for k in (keys.get(stage), keys.get("refine"), *keys.values()) if k
+    )
 
     # return first available (not in cooldown)
     for key in candidates:
@@ -159,7 +203,7 @@ def _get_provider_key(provider: str, stage: str) -> str:
             return key
 
     # all in cooldown — return first anyway
-    return candidates[0] if candidates else None
+    return next(iter(candidates), None)
 
 
 # ============================================================
@@ -190,6 +234,47 @@ def _record_success(key: str):
         _key_state[key]["fails"] = 0
 
 
+def _retry_delay(attempt: int, retry_after: str = None) -> float:
+    """
+    backoff delay with jitter — concurrent classification batches that
+    get rate limited together shouldn't all retry at the same instant.
+    a provider-supplied Retry-After wins when it asks for longer.
+    """
+    base = RETRY_DELAYS[attempt] if attempt < len(RETRY_DELAYS) else 10
+    delay = random.uniform(base * 0.5, base * 1.5)
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+# circuit breaker per cloud provider — after several consecutive failed
+# calls, skip straight to the ollama fallback for a while instead of
+# paying the full retry ladder on every single call
+_BREAKER_THRESHOLD = 3
+_BREAKER_COOLDOWN = 60
+_provider_breaker = {}
+
+
+def _breaker_open(provider: str) -> bool:
+    state = _provider_breaker.get(provider)
+    return bool(state) and time.time() < state.get("open_until", 0)
+
+
+def _breaker_record(provider: str, success: bool):
+    state = _provider_breaker.setdefault(provider, {"fails": 0, "open_until": 0})
+    if success:
+        state["fails"] = 0
+        return
+    state["fails"] += 1
+    if state["fails"] >= _BREAKER_THRESHOLD:
+        state["open_until"] = time.time() + _BREAKER_COOLDOWN
+        print(f"  [!] {provider.title()} failed {state['fails']} times in a row — "
+              f"skipping it for {_BREAKER_COOLDOWN}s")
+
+
 # ============================================================
 # PROVIDER API CALLS
 # ============================================================
@@ -214,18 +299,19 @@ def _call_gemini(prompt: str, api_key: str, stage: str = "summary", temperature:
 
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(url, json=payload, timeout=60)
+            response = _http.post(url, data=_json_dumps(payload),
+                                  headers={"Content-Type": "application/json"}, timeout=60)
 
             if response.status_code == 429:
                 _record_rate_limit(api_key)
-                delay = RETRY_DELAYS[attempt] if attempt < len(RETRY_DELAYS) else 10
-                print(f"  [!] Rate limited (429). Retrying in {delay}s... (attempt {attempt + 1}/{MAX_RETRIES})")
+                delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+                print(f"  [!] Rate limited (429). Retrying in {delay:.0f}s... (attempt {attempt + 1}/{MAX_RETRIES})")
                 time.sleep(delay)
                 continue
 
             response.raise_for_status()
             _record_success(api_key)
-            data = response.json()
+            data = _json_loads(response.content)
 
             candidates = data.get("candidates", [])
             if candidates:
@@ -263,20 +349,32 @@ def _call_anthropic(prompt: str, api_key: str, stage: str = "summary", temperatu
         "messages": [{"role": "user", "content": prompt}],
     }
 
+    # stages with an invariant scaffold send it as a cached system block —
+    # repeat batches within the TTL are billed at cache-read rates
+    static = _STAGE_STATIC_PROMPTS.get(stage)
+    if static and prompt.startswith(static):
+        headers["anthropic-beta"] = "prompt-caching-2024-07-31"
+        payload["system"] = [{
+            "type": "text",
+            "text": static,
+            "cache_control": {"type": "ephemeral"},
+        }]
+        payload["messages"] = [{"role": "user", "content": prompt[len(static):].lstrip()}]
+
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=90)
+            response = _http.post(url, data=_json_dumps(payload), headers=headers, timeout=90)
 
             if response.status_code == 429:
                 _record_rate_limit(api_key)
-                delay = RETRY_DELAYS[attempt] if attempt < len(RETRY_DELAYS) else 10
-                print(f"  [!] Anthropic rate limited. Retrying in {delay}s... (attempt {attempt + 1}/{MAX_RETRIES})")
+                delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+                print(f"  [!] Anthropic rate limited. Retrying in {delay:.0f}s... (attempt {attempt + 1}/{MAX_RETRIES})")
                 time.sleep(delay)
                 continue
 
             response.raise_for_status()
             _record_success(api_key)
-            data = response.json()
+            data = _json_loads(response.content)
 
             content = data.get("content", [])
             if content and isinstance(content, list):
@@ -319,18 +417,18 @@ def _call_openai_compatible(prompt: str, api_key: str, provider: str, stage: str
 
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=90)
+            response = _http.post(url, data=_json_dumps(payload), headers=headers, timeout=90)
 
             if response.status_code == 429:
                 _record_rate_limit(api_key)
-                delay = RETRY_DELAYS[attempt] if attempt < len(RETRY_DELAYS) else 10
-                print(f"  [!] {provider.title()} rate limited. Retrying in {delay}s... (attempt {attempt + 1}/{MAX_RETRIES})")
+                delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+                print(f"  [!] {provider.title()} rate limited. Retrying in {delay:.0f}s... (attempt {attempt + 1}/{MAX_RETRIES})")
                 time.sleep(delay)
                 continue
 
             response.raise_for_status()
             _record_success(api_key)
-            data = response.json()
+            data = _json_loads(response.content)
 
             choices = data.get("choices", [])
             if choices:
@@ -377,51 +475,119 @@ _PROVIDER_CALL_FN = {
 # OLLAMA (LOCAL MODEL)
 # ============================================================
 
+# cache the /api/tags probe briefly — call_llm otherwise hits ollama
+# twice per LLM call (availability check + model pick)
+_OLLAMA_TAGS_TTL = 5.0
+_ollama_tags_cache = {"ts": 0.0, "models": None}
+
+
+def _get_ollama_tags() -> list:
+    """fetch the ollama model list, cached for a few seconds. None = unreachable."""
+    now = time.time()
+    if now - _ollama_tags_cache["ts"] > _OLLAMA_TAGS_TTL:
+        try:
+            r = _http.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=3)
+            models = _json_loads(r.content).get("models", []) if r.status_code == 200 else None
+        except Exception:
+            models = None
+        _ollama_tags_cache["ts"] = now
+        _ollama_tags_cache["models"] = models
+    return _ollama_tags_cache["models"]
+
+
 def _ollama_available() -> bool:
     """check if ollama is running locally"""
-    try:
-        r = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=3)
-        return r.status_code == 200 and len(r.json().get("models", [])) > 0
-    except:
-        return False
+    models = _get_ollama_tags()
+    return bool(models)
 
 
 def _get_ollama_model() -> str:
     """get user-selected ollama model, or first available if none set"""
     if _active_ollama_model:
         return _active_ollama_model
-    try:
-        r = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=3)
-        models = r.json().get("models", [])
-        if models:
-            return models[0].get("name", "llama3.2")
-    except:
-        pass
+    models = _get_ollama_tags()
+    if models:
+        return models[0].get("name", "llama3.2")
     return None
 
 
+def warm_up_ollama():
+    """
+    preload the active local model so the first pipeline stage doesn't
+    pay the multi-second model load. no-op when ollama isn't the active
+    provider or isn't running.
+    """
+    if _active_provider != "ollama" or not _ollama_available():
+        return
+    model = _get_ollama_model()
+    if not model:
+        return
+    try:
+        print(f"[*] Warming up ollama model: {model}")
+        _http.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json={
+                "model": model,
+                "prompt": "ok",
+                "stream": False,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                # one token is enough — the point is loading the weights
+                "options": {"num_predict": 1},
+            },
+            timeout=300,
+        )
+        print(f"[+] Ollama model loaded")
+    except Exception as e:
+        print(f"[!] Ollama warm-up failed: {str(e)[:60]}")
+
+
 # lock to serialise Ollama requests (local models handle one request at a time)
 _ollama_lock = threading.Lock()
 
 
-def _call_ollama(prompt: str, model: str) -> str:
+def _call_ollama(prompt: str, model: str, stage: str = "summary") -> str:
     """call ollama api for local model inference (serialised via lock)"""
     url = f"{OLLAMA_BASE_URL}/api/generate"
 
+    options = {
+        "temperature": 0.1,
+        # cap output like the cloud providers — CPU decode time
+        # scales directly with generated tokens
+        "num_predict": STAGE_MAX_TOKENS.get(stage, 4096),
+    }
+
+    if OLLAMA_NUM_THREADS > 0:
+        options["num_thread"] = OLLAMA_NUM_THREADS
+
     payload = {
         "model": model,
         "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.1,
-        }
+        # stream tokens as they decode — the response is consumed while
+        # the model is still generating, and a stalled generation shows
+        # up as a read timeout between chunks instead of silently eating
+        # the whole request budget
+        "stream": True,
+        # keep the model resident between pipeline stages so each call
+        # doesn't pay the model load cost again
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": options,
     }
 
     with _ollama_lock:
         try:
-            response = requests.post(url, json=payload, timeout=600)
-            response.raise_for_status()
-            return response.json().get("response", "")
+            parts = []
+            with _http.post(url, data=_json_dumps(payload),
+                            headers={"Content-Type": "application/json"},
+                            timeout=(10, 600), stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    parts.append(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        break
+            return "".join(parts)
         except Exception as e:
             print(f"  [!] Ollama request failed: {str(e)[:80]}")
             raise
@@ -445,7 +611,7 @@ def call_llm(prompt: str, stage: str, temperature: float = 0.1) -> str:
             if model:
                 print(f"  [*] Using Ollama ({model}) for stage '{stage}'")
                 try:
-                    return _call_ollama(prompt, model)
+                    return _call_ollama(prompt, model, stage=stage)
                 except Exception:
                     print(f"  [!] Ollama failed for stage '{stage}'")
         print(f"  [-] Ollama not available for stage '{stage}'. Skipping AI step.")
@@ -456,10 +622,16 @@ def call_llm(prompt: str, stage: str, temperature: float = 0.1) -> str:
     call_fn = _PROVIDER_CALL_FN.get(provider)
 
     if api_key and call_fn:
-        try:
-            return call_fn(prompt, api_key, stage=stage, temperature=temperature)
-        except Exception:
-            print(f"  [!] {provider.title()} failed for stage '{stage}', trying fallback...")
+        if _breaker_open(provider):
+            print(f"  [!] {provider.title()} circuit open, using fallback for stage '{stage}'")
+        else:
+            try:
+                result = call_fn(prompt, api_key, stage=stage, temperature=temperature)
+                _breaker_record(provider, True)
+                return result
+            except Exception:
+                _breaker_record(provider, False)
+                print(f"  [!] {provider.title()} failed for stage '{stage}', trying fallback...")
 
     # fallback: try ollama
     if _ollama_available():
@@ -467,7 +639,7 @@ def call_llm(prompt: str, stage: str, temperature: float = 0.1) -> str:
         if model:
             print(f"  [*] Falling back to Ollama ({model}) for stage '{stage}'")
             try:
-                return _call_ollama(prompt, model)
+                return _call_ollama(prompt, model, stage=stage)
             except Exception:
                 print(f"  [!] Ollama also failed for stage '{stage}'")
 
@@ -490,8 +662,11 @@ def _call_llm_json_retry(prompt: str, stage: str) -> list:
     except (json.JSONDecodeError, ValueError) as e:
         print(f"  [!] JSON parse failed: {str(e)[:50]}. Retrying with temp=0.1...")
 
-    # retry with lower temperature and stricter prompt
-    retry_prompt = "Output ONLY raw JSON array. No markdown fences, no explanation, no text before or after.\n\n" + prompt
+    # retry with lower temperature and stricter prompt. the stricter
+    # instruction is appended rather than prepended — shifting the first
+    # byte of the prompt would void any provider prompt-cache prefix hit
+    # and the cacheable system-block split on the classify scaffold
+    retry_prompt = prompt + "\n\nOutput ONLY raw JSON array. No markdown fences, no explanation, no text before or after."
     result = call_llm(retry_prompt, stage, temperature=0.1)
     if not result:
         return None
@@ -507,11 +682,62 @@ def _call_llm_json_retry(prompt: str, stage: str) -> list:
 # STAGE 1: QUERY REFINEMENT
 # ============================================================
 
+# refined keywords per normalized query — automation timer runs repeat
+# the same query every cycle, and the keyword expansion is stable enough
+# that paying an LLM round trip each time buys nothing
+_refine_cache = {}
+_REFINE_CACHE_MAX = 64
+
+# both query-level caches (refined keywords, company-name variants) are
+# persisted together so restarts between automation runs don't redo the
+# same deterministic prompts — same pattern as the classify cache
+_QUERY_CACHE_FILE = os.path.join("output", "query_cache.json")
+_query_cache_loaded = False
+
+
+def _load_query_caches():
+    global _query_cache_loaded
+    if _query_cache_loaded:
+        return
+    _query_cache_loaded = True
+    if os.path.isfile(_QUERY_CACHE_FILE):
+        try:
+            with open(_QUERY_CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                _refine_cache.update(data.get("refine", {}))
+                _company_names_cache.update(data.get("company_names", {}))
+        except (json.JSONDecodeError, ValueError, OSError):
+            pass
+
+
+def _save_query_caches():
+    try:
+        os.makedirs("output", exist_ok=True)
+        with open(_QUERY_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"refine": _refine_cache,
+                       "company_names": _company_names_cache}, f)
+    except OSError:
+        pass
+
+
+# characters stripped off each keyword line of the refine response —
+# whitespace, quotes, and list-bullet punctuation
+_LINE_STRIP_CHARS = ' \t\r\n"\'-'
+
+
 def refine_query(query: str) -> list:
     """
     stage 1: generate threat-intelligence-optimized search strings for dark web.
     returns list of keyword strings targeting real threat data.
     """
+    cache_key = " ".join(query.lower().split())
+    _load_query_caches()
+    cached = _refine_cache.get(cache_key)
+    if cached is not None:
+        print("  [*] Reusing cached keywords for this query")
+        return list(cached)
+
     prompt = f"""You are a Dark Web Threat Intelligence Analyst. Generate search queries for dark web search engines related to the provided input.
 Logic:
 - If the input is a target (company/person/domain), include the target in every query.
@@ -526,8 +752,9 @@ INPUT: {query}"""
 
     result = call_llm(prompt, "refine")
     if result:
-        import re
-        lines = [line.strip().strip('"').strip("'").strip('-').strip()
+        # one strip pass with the combined character set instead of a
+        # chain of per-character strips, each allocating a new string
+        lines = [line.strip(_LINE_STRIP_CHARS)
                  for line in result.strip().split("\n") if line.strip()]
         keywords = []
         for line in lines:
@@ -536,10 +763,68 @@ INPUT: {query}"""
                 keywords.append(cleaned)
 
         if keywords:
-            return keywords[:5]
+            # models occasionally repeat a keyword across lines;
+            # dict.fromkeys drops repeats while keeping first-seen order
+            keywords = list(dict.fromkeys(keywords))[:5]
+            if len(_refine_cache) >= _REFINE_CACHE_MAX:
+                _refine_cache.pop(next(iter(_refine_cache)))
+            _refine_cache[cache_key] = list(keywords)
+            _save_query_caches()
+            return keywords
+
+    # LLM unavailable — fall back to mechanical expansions; don't cache,
+    # a later run with a working LLM may do better
+    basics = _derive_basic_keywords(query)
+    if basics:
+        print("  [*] No LLM available — using template-derived keywords")
+        return basics
+    return [query]
 
 
-    return [query]
+# mechanical expansions used when no LLM is reachable — the pipeline
+# used to fall back to searching only the raw query, losing the common
+# breach/leak phrasings a model would have added
+_BASIC_QUERY_SUFFIXES = ("breach", "leak", "credentials", "database dump")
+
+
+def _derive_basic_keywords(query: str) -> list:
+    """cheap template expansion of the query for the no-LLM fallback"""
+    q = " ".join(query.split())
+    if not q:
+        return []
+    lowered = q.lower()
+    return [f"{q} {suffix}" for suffix in _BASIC_QUERY_SUFFIXES
+            if suffix.split()[0] not in lowered][:4]
+
+
+def dedupe_search_queries(queries: list) -> list:
+    """
+    drop queries another query already contains — every redundant query
+    costs a full multi-engine search round plus the rate-limit delay.
+    exact duplicates keep their first occurrence; a query that is a
+    substring of a longer one is dropped in favour of the longer, more
+    specific string. order is otherwise preserved.
+    """
+    lowered = [" ".join(q.lower().split()) for q in queries]
+    kept = []
+    for i, q in enumerate(queries):
+        qi = lowered[i]
+        if not qi:
+            continue
+        redundant = False
+        for j, qj in enumerate(lowered):
+            if i == j:
+                continue
+            if qi == qj:
+                if j < i:
+                    redundant = True
+                    break
+            elif qi in qj:
+                redundant = True
+                break
+        if not redundant:
+            kept.append(q)
+    return kept
 
 
 # ============================================================
@@ -614,28 +899,21 @@ OUTPUT:
 
     result = call_llm(prompt, "filter")
     if result:
-        # parse indices from response
-        import re
-        parsed = []
-        for match in re.findall(r"\d+", result):
-            try:
-                idx = int(match)
-                if 1 <= idx <= len(results):
-                    parsed.append(idx)
-            except ValueError:
-                continue
-
-        # deduplicate while preserving order
+        # parse indices from response, deduplicating inline — no
+        # intermediate list of duplicates to build and throw away, and
+        # we can stop as soon as the limit is reached
         seen = set()
         unique_indices = []
-        for idx in parsed:
-            if idx not in seen:
+        for match in re.findall(r"\d+", result):
+            idx = int(match)
+            if 1 <= idx <= len(results) and idx not in seen:
                 seen.add(idx)
                 unique_indices.append(idx)
+                if len(unique_indices) == limit:
+                    break
 
         if unique_indices:
-            filtered = [results[i - 1] for i in unique_indices[:limit]]
-            return filtered
+            return [results[i - 1] for i in unique_indices]
 
     # fallback: return first limit results
     print("  [!] Could not parse filter response. Using first results.")
@@ -646,18 +924,21 @@ OUTPUT:
 # STAGE 2.5: COMPANY CATEGORIZATION
 # ============================================================
 
-def categorize_company_relevance(query: str, scraped_data: dict) -> dict:
-    """
-    stage 2.5: check scraped data for company/target name mentions.
-    1. uses a single LLM call to extract the company/target name and variants from the query.
-    2. does simple case-insensitive string matching against scraped content.
-    categorizes each URL as 'company_specific' or 'general'.
-    returns dict: {url: 'company_specific' | 'general'}
-    """
-    if not scraped_data:
-        return {}
+# extracted company-name variants per normalized query — the variant
+# set is a function of the query alone, so repeat runs (automation
+# timer, re-scrapes) reuse it instead of re-asking the LLM
+_company_names_cache = {}
+_COMPANY_NAMES_CACHE_MAX = 64
+
+
+def _extract_company_names(query: str) -> list:
+    """LLM extraction of company/target name variants from the query"""
+    cache_key = " ".join(query.lower().split())
+    _load_query_caches()
+    cached = _company_names_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
 
-    # --- step 1: extract company name(s) from the query via LLM ---
     prompt = f"""Extract the company name, brand name, or specific target from this search query.
 Return ONLY the names as a comma-separated list. Include common variations, abbreviations, and domain names.
 
@@ -673,18 +954,61 @@ If the query is about a GENERAL topic (not targeting a specific company/person/o
 Query: "{query}"
 Names:"""
 
-    import re
     result = call_llm(prompt, "company_check")
-    
+
     company_names = []
     if result:
-        cleaned = result.strip().strip('"').strip("'")
+        cleaned = result.strip(' \t\r\n"\'')
         if cleaned.upper() != "NONE" and cleaned:
             # split by comma, clean each name
             for name in cleaned.split(","):
-                name = name.strip().strip('"').strip("'").strip()
+                name = name.strip(' \t\r\n"\'')
                 if name and len(name) > 1:
                     company_names.append(name)
+        # only cache answered extractions — an unavailable LLM should
+        # not pin a query to "no target" forever
+        if len(_company_names_cache) >= _COMPANY_NAMES_CACHE_MAX:
+            _company_names_cache.pop(next(iter(_company_names_cache)))
+        _company_names_cache[cache_key] = list(company_names)
+        _save_query_caches()
+
+    return company_names
+
+
+@lru_cache(maxsize=16)
+def _build_target_matcher(search_terms: tuple):
+    """
+    literal multi-pattern matcher for company-name variants, memoized —
+    the automation timer re-runs the same query every cycle with a
+    stable term set, so the automaton is built once per target. with
+    pyahocorasick installed an automaton scans each page once no matter
+    how many variants there are; otherwise a combined regex alternation.
+    """
+    try:
+        import ahocorasick
+        automaton = ahocorasick.Automaton()
+        for term in search_terms:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return lambda content: next(automaton.iter(content.lower()), None) is not None
+    except ImportError:
+        term_pattern = re.compile("|".join(re.escape(term) for term in search_terms), re.IGNORECASE)
+        return lambda content: term_pattern.search(content) is not None
+
+
+def categorize_company_relevance(query: str, scraped_data: dict) -> dict:
+    """
+    stage 2.5: check scraped data for company/target name mentions.
+    1. uses a single LLM call to extract the company/target name and variants from the query.
+    2. does simple case-insensitive string matching against scraped content.
+    categorizes each URL as 'company_specific' or 'general'.
+    returns dict: {url: 'company_specific' | 'general'}
+    """
+    if not scraped_data:
+        return {}
+
+    # --- step 1: extract company name(s) from the query via LLM ---
+    company_names = _extract_company_names(query)
 
     # also add the raw query words as potential matches (if short enough to be a name)
     query_words = query.strip().split()
@@ -698,20 +1022,20 @@ Names:"""
         return {url: "general" for url, content in scraped_data.items()
                 if not content.startswith("[ERROR")}
 
-    # deduplicate and lowercase for matching
-    search_terms = list(set(name.lower() for name in company_names if len(name) > 1))
+    # deduplicate, lowercase, and sort for a stable memoization key
+    search_terms = tuple(sorted(set(name.lower() for name in company_names if len(name) > 1)))
     print(f"  [*] Company/target names to match: {', '.join(company_names)}")
 
+    _mentions_target = _build_target_matcher(search_terms)
+
     # --- step 2: string match against scraped content ---
     all_categories = {}
     for url, content in scraped_data.items():
         if content.startswith("[ERROR"):
             continue
 
-        content_lower = content.lower()
         # check if any company name variant appears in the content
-        found = any(term in content_lower for term in search_terms)
-        all_categories[url] = "company_specific" if found else "general"
+        all_categories[url] = "company_specific" if _mentions_target(content) else "general"
 
     return all_categories
 
@@ -721,72 +1045,118 @@ Names:"""
 # STAGE 3: THREAT CLASSIFICATION
 # ============================================================
 
-def _parse_classification_json(result: str) -> list:
-    """parse classification JSON from LLM response, handling markdown fences"""
-    cleaned = result.strip()
-    if cleaned.startswith("```"):
-        cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else cleaned
-        cleaned = cleaned.rsplit("```", 1)[0]
-    cleaned = cleaned.strip()
-    return json.loads(cleaned)
+import hashlib
 
+# classification verdict cache keyed by (query, cleaned content) hash —
+# bounded FIFO so long automation sessions don't grow it unchecked.
+# persisted to output/ like the other run state (alerts, login walls)
+# so verdicts survive process restarts between automation runs.
+_CLASSIFY_CACHE_MAX = 1024
+_CLASSIFY_CACHE_FILE = os.path.join("output", "classify_cache.json")
+_classify_cache = {}
+_classify_cache_loaded = False
+_classify_cache_dirty = False
 
-def classify_threats(query: str, scraped_data: dict, company_categories: dict = None) -> dict:
-    """
-    stage 3: classify scraped pages into threat categories.
-    if company_categories is provided, each entry gets a 'company_relevance' field.
-    """
-    if not scraped_data:
-        return {}
 
-    # clean content before classification
+def _classify_cache_key(query: str, content: str) -> str:
+    return hashlib.sha256(f"{query}\x00{content}".encode("utf-8", "ignore")).hexdigest()
+
+
+def _load_classify_cache():
+    global _classify_cache_loaded
+    if _classify_cache_loaded:
+        return
+    _classify_cache_loaded = True
+    if os.path.isfile(_CLASSIFY_CACHE_FILE):
+        try:
+            with open(_CLASSIFY_CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                _classify_cache.update(data)
+        except (json.JSONDecodeError, ValueError, OSError):
+            pass
+
+
+def _save_classify_cache():
+    global _classify_cache_dirty
+    if not _classify_cache_dirty:
+        return
+    _classify_cache_dirty = False
     try:
-        from content_cleaner import clean_content, extract_meaningful_section
-        use_cleaner = True
-    except ImportError:
-        use_cleaner = False
+        os.makedirs("output", exist_ok=True)
+        with open(_CLASSIFY_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(_classify_cache, f)
+    except OSError:
+        pass
 
-    # build entries with cleaned content
-    entries = []
-    for url, content in scraped_data.items():
-        if content.startswith("[ERROR"):
-            continue
-        if use_cleaner:
-            content = extract_meaningful_section(clean_content(content), max_chars=800)
-        else:
-            content = content[:800]
-        entries.append((url, content))
 
-    if not entries:
-        return {}
+def _classify_cache_put(key: str, entry: dict):
+    global _classify_cache_dirty
+    if len(_classify_cache) >= _CLASSIFY_CACHE_MAX:
+        _classify_cache.pop(next(iter(_classify_cache)))
+    _classify_cache[key] = entry
+    _classify_cache_dirty = True
 
-    # batch processing — 6 pages per LLM call to prevent JSON truncation
-    BATCH_SIZE = 6
-    all_classified = {}
+@lru_cache(maxsize=128)
+def _cleaned_content(content: str) -> str:
+    """
+    boilerplate-stripped page content, cached so classification and the
+    summary stage don't each re-clean the same pages.
+    """
+    from content_cleaner import clean_content
+    return clean_content(content)
 
-    for batch_start in range(0, len(entries), BATCH_SIZE):
-        batch = entries[batch_start:batch_start + BATCH_SIZE]
-        batch_num = (batch_start // BATCH_SIZE) + 1
-        total_batches = (len(entries) + BATCH_SIZE - 1) // BATCH_SIZE
 
-        if total_batches > 1:
-            print(f"  [*] Classifying batch {batch_num}/{total_batches} ({len(batch)} pages)...")
+# compiled once — every JSON-stage LLM response passes through this
+_FENCE_RE = re.compile(r"```(?:json)?\s*")
 
-        content_block = "\n\n".join(
-            f"[{i+1}] URL: {url}\nContent: {content}"
-            for i, (url, content) in enumerate(batch)
-        )
 
-        prompt = f"""
+def _unwrap_json_array(decoded):
+    """
+    accept the array itself, or an object wrapping it — models
+    occasionally return {"results": [...]} despite the instructions.
+    picked by structure, not key name.
+    """
+    if isinstance(decoded, dict):
+        for value in decoded.values():
+            if isinstance(value, list):
+                return value
+    return decoded
+
+
+def _parse_classification_json(result: str) -> list:
+    """parse classification JSON from LLM response, handling markdown fences"""
+    stripped = result.strip()
+    # fast path — most responses obey "return ONLY a JSON array", no
+    # point running the fence regex over clean JSON
+    if stripped.startswith("[") and stripped.endswith("]"):
+        try:
+            return _json_loads(stripped)
+        except ValueError:
+            pass
+    cleaned = _FENCE_RE.sub("", stripped).strip()
+    try:
+        return _unwrap_json_array(_json_loads(cleaned))
+    except ValueError:
+        # salvage an array embedded in prose before burning a full LLM
+        # retry round trip on a parse failure
+        start, end = cleaned.find("["), cleaned.rfind("]")
+        if start != -1 and end > start:
+            return _json_loads(cleaned[start:end + 1])
+        raise
+
+
+# the classification prompt scaffold is invariant across batches —
+# built once here, only the query and page block vary per call. the
+# static part leads so providers with prompt caching can reuse the
+# prefix across calls; only the tail changes per batch.
+_CLASSIFY_PROMPT_STATIC = """
 ROLE=You are a cyber threat intelligence classification engine.
 TASK=For each page below:
 1. Classify the page into ONE category.
 2. Assign a severity level.
 3. Extract the most important threat phrase from the content.
 
-CONTEXT=Search query: {query}
-PAGES={content_block}
-
 CATEGORY DEFINITIONS
 
 data_breach
@@ -849,13 +1219,129 @@ Use the URL exactly as provided.
 FORMAT
 
 [
-{{"url":"...", "category":"...", "severity":"...", "reason":"short reason max 30 chars", "evidence":"key phrase max 50 chars"}}
+{"url":"...", "category":"...", "severity":"...", "reason":"short reason max 30 chars", "evidence":"key phrase max 50 chars"}
 ]
+"""
+
+# only the tail goes through the format engine — re-rendering the 3 KB
+# scaffold above per batch just to unescape it was wasted work
+_CLASSIFY_PROMPT_TAIL = """
+CONTEXT=Search query: {query}
+PAGES={content_block}
 
 JSON:
 """
 
-        parsed = _call_llm_json_retry(prompt, "classify")
+# static prompt prefixes per stage — _call_anthropic splits these out
+# into a cacheable system block so repeat batches within the cache TTL
+# only pay for the dynamic tail
+_STAGE_STATIC_PROMPTS = {
+    "classify": _CLASSIFY_PROMPT_STATIC,
+}
+
+
+def classify_threats(query: str, scraped_data: dict, company_categories: dict = None) -> dict:
+    """
+    stage 3: classify scraped pages into threat categories.
+    if company_categories is provided, each entry gets a 'company_relevance' field.
+    """
+    if not scraped_data:
+        return {}
+
+    # clean content before classification
+    try:
+        from content_cleaner import clean_content, extract_meaningful_section
+        use_cleaner = True
+    except ImportError:
+        use_cleaner = False
+
+    all_classified = {}
+
+    # build entries with cleaned content
+    entries = []
+    skipped_short = 0
+    for url, content in scraped_data.items():
+        if content.startswith("[ERROR"):
+            continue
+        if use_cleaner:
+            content = extract_meaningful_section(_cleaned_content(content), max_chars=800)
+        else:
+            content = content[:800]
+        # near-empty pages can't support a verdict — decide them here
+        # instead of spending an LLM call; the reason records the skip
+        if len(content.strip()) < CLASSIFY_MIN_CHARS:
+            entry = {"category": "other", "severity": "low", "reason": "too little content", "evidence": ""}
+            if company_categories:
+                entry["company_relevance"] = company_categories.get(url, "general")
+            all_classified[url] = entry
+            skipped_short += 1
+            continue
+        entries.append((url, content))
+
+    if skipped_short:
+        print(f"  [*] Skipped LLM classification for {skipped_short} near-empty pages")
+
+    if not entries:
+        return all_classified
+
+    # reuse cached verdicts for unchanged pages — automated re-runs
+    # mostly re-scrape the same content, so only new/changed pages
+    # need an LLM round trip. company_relevance is per-run, so it is
+    # re-attached from this run's categorization.
+    _load_classify_cache()
+
+    entry_keys = {}
+    pending = []
+    cache_hits = 0
+    for url, content in entries:
+        key = _classify_cache_key(query, content)
+        entry_keys[url] = key
+        cached = _classify_cache.get(key)
+        if cached is not None:
+            entry = dict(cached)
+            if company_categories:
+                entry["company_relevance"] = company_categories.get(url, "general")
+            all_classified[url] = entry
+            cache_hits += 1
+        else:
+            pending.append((url, content))
+
+    if cache_hits:
+        print(f"  [*] Reusing cached classifications for {cache_hits} unchanged pages")
+    entries = pending
+
+    # batch processing — CLASSIFY_BATCH_SIZE pages per LLM call to prevent JSON truncation
+    BATCH_SIZE = CLASSIFY_BATCH_SIZE
+
+    batches = [entries[i:i + BATCH_SIZE] for i in range(0, len(entries), BATCH_SIZE)]
+    total_batches = len(batches)
+
+    def _classify_batch(batch_num, batch):
+        if total_batches > 1:
+            print(f"  [*] Classifying batch {batch_num}/{total_batches} ({len(batch)} pages)...")
+        content_block = "\n\n".join(
+            f"[{i+1}] URL: {url}\nContent: {content}"
+            for i, (url, content) in enumerate(batch)
+        )
+        prompt = _CLASSIFY_PROMPT_STATIC + _CLASSIFY_PROMPT_TAIL.format(query=query, content_block=content_block)
+        return _call_llm_json_retry(prompt, "classify")
+
+    # the batches are independent prompts waiting on network latency, so
+    # issue a few in flight at once (ollama serialises via its lock, so
+    # this only overlaps calls on the cloud providers). results are
+    # folded back in batch order to keep output deterministic.
+    if CLASSIFY_CONCURRENCY > 1 and total_batches > 1 and _active_provider != "ollama":
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=CLASSIFY_CONCURRENCY) as pool:
+            parsed_batches = list(pool.map(
+                lambda args: _classify_batch(*args),
+                [(num, batch) for num, batch in enumerate(batches, 1)],
+            ))
+    else:
+        parsed_batches = [_classify_batch(num, batch)
+                          for num, batch in enumerate(batches, 1)]
+
+    for batch_num, (batch, parsed) in enumerate(zip(batches, parsed_batches), 1):
         if parsed:
             try:
                 for item in parsed:
@@ -866,6 +1352,10 @@ JSON:
                         "reason": item.get("reason", "")[:60],
                         "evidence": item.get("evidence", "")[:80],
                     }
+                    # cache the verdict before the per-run relevance tag
+                    cache_key = entry_keys.get(url)
+                    if cache_key:
+                        _classify_cache_put(cache_key, dict(entry))
                     if company_categories:
                         entry["company_relevance"] = company_categories.get(url, "general")
                     all_classified[url] = entry
@@ -885,6 +1375,7 @@ JSON:
                     entry["company_relevance"] = company_categories.get(url, "general")
                 all_classified[url] = entry
 
+    _save_classify_cache()
     return all_classified
 
 
@@ -892,6 +1383,11 @@ JSON:
 # STAGE 4: INTELLIGENCE SUMMARY
 # ============================================================
 
+# navigation/meta page suffixes excluded from the summary prompt —
+# prepared once here instead of per page inside the entry loop
+_SUMMARY_SKIP_SUFFIXES = ('/whats-new', '/whats-new/posts', '/members', '/rules')
+
+
 def generate_summary(query: str, scraped_data: dict, classifications: dict, regex_iocs: dict = None, actor_contacts: dict = None, company_categories: dict = None) -> str:
     """
     stage 4: generate structured threat intelligence report with evidence.
@@ -917,8 +1413,7 @@ def generate_summary(query: str, scraped_data: dict, classifications: dict, rege
             continue
 
         # skip navigation/meta pages that snuck through
-        skip_suffixes = ['/whats-new', '/whats-new/posts', '/members', '/rules']
-        if any(url.rstrip('/').endswith(s) for s in skip_suffixes):
+        if url.rstrip('/').endswith(_SUMMARY_SKIP_SUFFIXES):
             continue
 
         cls = classifications.get(url, {})
@@ -927,10 +1422,15 @@ def generate_summary(query: str, scraped_data: dict, classifications: dict, rege
         evidence = cls.get("evidence", "N/A")
 
         if use_cleaner:
-            display_content = extract_meaningful_section(clean_content(content), max_chars=400)
+            display_content = extract_meaningful_section(_cleaned_content(content), max_chars=400)
         else:
             display_content = content[:400]
 
+        # near-empty pages add prompt tokens without adding signal —
+        # same threshold the classifier uses to skip them
+        if len(display_content.strip()) < CLASSIFY_MIN_CHARS:
+            continue
+
         # de-dup by first 80 chars of cleaned content (catches mirror sites)
         content_sig = display_content[:80].strip().lower()
         if content_sig in seen_titles:
@@ -972,9 +1472,15 @@ def generate_summary(query: str, scraped_data: dict, classifications: dict, rege
     # format threat actor contacts — enriched format with context
     contacts_block = ""
     if actor_contacts:
+        # only 25 lines make it into the prompt — stop assembling once
+        # the cap is hit instead of formatting everything and slicing
         contact_lines = ["Threat Actor Contacts (regex-extracted from pages):"]
         for url, contacts in actor_contacts.items():
+            if len(contact_lines) >= 25:
+                break
             for contact_type, items in contacts.items():
+                if len(contact_lines) >= 25:
+                    break
                 for item in (items[:3] if isinstance(items, list) else [items]):
                     if isinstance(item, dict):
                         val = item.get("value", str(item))
@@ -992,7 +1498,11 @@ def generate_summary(query: str, scraped_data: dict, classifications: dict, rege
     if regex_iocs:
         ioc_lines = ["Pre-extracted IOCs (regex-verified):"]
         for url, iocs in regex_iocs.items():
+            if len(ioc_lines) >= 25:
+                break
             for ioc_type, values in iocs.items():
+                if len(ioc_lines) >= 25:
+                    break
                 # skip noisy types (likely catalog listings)
                 if len(values) > 30:
                     ioc_lines.append(f"  {ioc_type}: [{len(values)} items from catalog — omitted]")
@@ -37,9 +37,13 @@ BOILERPLATE_PATTERNS = [
 # unicode/emoji noise commonly used as decoration
 DECORATIVE_PATTERNS = re.compile(r'[⭐️✨🔥💀🎯🔒🛡️⚡️🌐🔗💰💎🚀]{2,}')
 
-# repeated whitespace
-MULTI_NEWLINE = re.compile(r'\n{3,}')
-MULTI_SPACE = re.compile(r'[ \t]{3,}')
+# repeated whitespace — newline runs and space/tab runs combined into a
+# single alternation so normalization is one pass over the text
+MULTI_WHITESPACE = re.compile(r'\n{3,}|[ \t]{3,}')
+
+
+def _collapse_whitespace(match) -> str:
+    return '\n\n' if '\n' in match.group() else ' '
 
 
 def clean_content(text: str) -> str:
@@ -60,8 +64,7 @@ def clean_content(text: str) -> str:
     cleaned = DECORATIVE_PATTERNS.sub('', cleaned)
 
     # normalize whitespace
-    cleaned = MULTI_NEWLINE.sub('\n\n', cleaned)
-    cleaned = MULTI_SPACE.sub(' ', cleaned)
+    cleaned = MULTI_WHITESPACE.sub(_collapse_whitespace, cleaned)
     cleaned = cleaned.strip()
 
     # if cleaning removed everything, return original (better than empty)
@@ -80,18 +83,19 @@ def extract_meaningful_section(text: str, max_chars: int = 1500) -> str:
     if not text or len(text) <= max_chars:
         return text
 
-    lines = text.split('\n')
+    # skip leading short lines (likely navigation/breadcrumbs) by
+    # tracking character offsets, then slice the original string —
+    # avoids rebuilding the whole page with a join
     meaningful_start = 0
-
-    # skip leading short lines (likely navigation/breadcrumbs)
-    for i, line in enumerate(lines):
+    offset = 0
+    for line in text.splitlines(keepends=True):
         stripped = line.strip()
         if len(stripped) > 60 and not stripped.startswith(('Home', 'Forums', 'Menu', '⭐')):
-            meaningful_start = i
+            meaningful_start = offset
             break
+        offset += len(line)
 
-    # reconstruct from meaningful start
-    meaningful_text = '\n'.join(lines[meaningful_start:])
+    meaningful_text = text[meaningful_start:]
 
     if len(meaningful_text) > max_chars:
         meaningful_text = meaningful_text[:max_chars]
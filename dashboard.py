@@ -6,6 +6,8 @@ import os
 import json
 import time
 import threading
+from collections import deque
+from itertools import islice
 from datetime import datetime
 import functools
 print = functools.partial(print, flush=True)
@@ -24,6 +26,16 @@ MAX_ENGINES = len(SEARCH_ENGINES)
 _jobs = {}
 _job_lock = threading.Lock()
 
+# pipeline jobs run on a small shared pool instead of one unbounded
+# thread per request — concurrent pipelines would contend for Tor
+# circuits, the output/ files, and the serialised local model. jobs
+# submitted while one is running stay "queued" until a worker frees up.
+from concurrent.futures import ThreadPoolExecutor
+_job_pool = ThreadPoolExecutor(
+    max_workers=max(1, int(os.getenv("DASHBOARD_JOB_WORKERS", "1"))),
+    thread_name_prefix="pipeline",
+)
+
 # automation state
 _AUTO_SETTINGS_FILE = os.path.join("output", "automation_settings.json")
 _ALERTS_FILE = os.path.join("output", "alerts.json")
@@ -67,9 +79,8 @@ def _save_alerts(alerts):
         json.dump(alerts, f, indent=2)
 
 
-def _add_alert(severity, title, evidence="", category=""):
-    """append a new alert to the alerts history"""
-    alerts = _load_alerts()
+def _make_alert_entry(severity, title, evidence="", category=""):
+    """build a single alert entry dict"""
     entry = {
         "timestamp": datetime.now().strftime("%b %d, %I:%M %p"),
         "severity": severity,
@@ -78,13 +89,26 @@ def _add_alert(severity, title, evidence="", category=""):
     }
     if category:
         entry["category"] = category
-    alerts.insert(0, entry)
+    return entry
+
+
+def _add_alerts(entries):
+    """prepend a batch of alerts with a single load + write of the history file"""
+    alerts = _load_alerts()
+    if not entries:
+        return alerts
+    alerts[:0] = entries
     # keep latest 50 alerts
     alerts = alerts[:50]
     _save_alerts(alerts)
     return alerts
 
 
+def _add_alert(severity, title, evidence="", category=""):
+    """append a new alert to the alerts history"""
+    return _add_alerts([_make_alert_entry(severity, title, evidence, category)])
+
+
 def _generate_alerts_from_classifications(query, classifications, company_categories):
     """extract company-specific key findings from classifications and add as alerts.
     deduplicates against existing alerts to avoid showing the same finding twice."""
@@ -121,10 +145,11 @@ def _generate_alerts_from_classifications(query, classifications, company_catego
     sev_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
     findings_to_alert.sort(key=lambda x: sev_order.get(x.get("severity", "low"), 3))
 
-    # add individual alerts for the top findings (max 5), skipping duplicates
-    added = 0
+    # collect alerts for the top findings (max 5), skipping duplicates,
+    # then persist them in one batch write instead of one write per alert
+    new_entries = []
     for finding in findings_to_alert:
-        if added >= 5:
+        if len(new_entries) >= 5:
             break
 
         cat = finding.get("category", "other")
@@ -141,11 +166,12 @@ def _generate_alerts_from_classifications(query, classifications, company_catego
         alert_sev = "critical" if sev in ("critical", "high") else "medium"
         title = f"{cat.replace('_', ' ').title()}: {reason}" if reason else f"{cat.replace('_', ' ').title()} detected"
 
-        _add_alert(alert_sev, title, evidence, category=cat)
+        new_entries.append(_make_alert_entry(alert_sev, title, evidence, category=cat))
         existing_fingerprints.add(fingerprint)
-        added += 1
 
-    if added == 0:
+    _add_alerts(new_entries)
+
+    if not new_entries:
         # all findings were duplicates — log a quiet heartbeat
         _add_alert("clear", f"Scan complete for \"{query}\"",
                    f"No new findings. {len(findings_to_alert)} findings already tracked.")
@@ -207,7 +233,9 @@ def _auto_run(query, config):
         }
 
     try:
-        _run_pipeline(job_id, query, config)
+        # run through the shared job pool so an automated run can't
+        # execute concurrently with a manual one
+        _job_pool.submit(_run_pipeline, job_id, query, config).result()
     except Exception as e:
         _add_alert("medium", "Automated run failed", str(e)[:300])
 
@@ -231,7 +259,12 @@ def _run_pipeline(job_id: str, query: str, config: dict):
     with _job_lock:
         _jobs[job_id]["status"] = "running"
         _jobs[job_id]["started"] = time.time()
-        _jobs[job_id]["logs"] = []
+        # bounded deque: appends past the cap evict the oldest line in
+        # O(1) instead of re-copying the last 200 lines on every print.
+        # log_total counts lines ever appended so the /logs cursor stays
+        # monotonic even after eviction.
+        _jobs[job_id]["logs"] = deque(maxlen=200)
+        _jobs[job_id]["log_total"] = 0
 
     output_buffer = io.StringIO()
 
@@ -242,10 +275,8 @@ def _run_pipeline(job_id: str, query: str, config: dict):
         with _job_lock:
             job = _jobs.get(job_id)
             if job is not None:
-                job.setdefault("logs", []).append(msg)
-                # keep last 200 lines
-                if len(job["logs"]) > 200:
-                    job["logs"] = job["logs"][-200:]
+                job.setdefault("logs", deque(maxlen=200)).append(msg)
+                job["log_total"] = job.get("log_total", 0) + 1
         kwargs.setdefault("flush", True)
         _original_print(*args, **kwargs)
 
@@ -264,9 +295,9 @@ def _run_pipeline(job_id: str, query: str, config: dict):
     _forum_mod.print = _capturing_print
 
     try:
-        from search import search_dark_web, save_results, get_urls_from_results
+        from search import search_dark_web, search_dark_web_multi, save_results, get_urls_from_results
         from scrape import scrape_all, save_scraped_data
-        from ioc_extractor import extract_iocs_from_scraped, extract_contacts_from_scraped, format_iocs_summary
+        from ioc_extractor import extract_all_from_scraped, format_iocs_summary
 
         use_ai = config.get("use_ai", True)
         ai_provider = config.get("ai_provider", "gemini")
@@ -291,16 +322,21 @@ def _run_pipeline(job_id: str, query: str, config: dict):
 
         search_queries = [query]
         if use_ai:
-            from ai_engine import refine_query
+            from ai_engine import refine_query, dedupe_search_queries
             keywords = refine_query(query)
-            search_queries = [query] + keywords
+            search_queries = dedupe_search_queries([query] + keywords)
 
         all_results = []
         seen_urls = set()
+        if _check_abort(job_id): raise InterruptedError("Aborted")
+        # one event loop for all queries — engines overlap across query
+        # rounds instead of the job serializing on each round's slowest engine
+        if len(search_queries) > 1:
+            batches = search_dark_web_multi(search_queries, max_workers=threads, num_engines=num_engines, check_abort=lambda: _check_abort(job_id))
+        else:
+            batches = {search_queries[0]: search_dark_web(search_queries[0], max_workers=threads, num_engines=num_engines, check_abort=lambda: _check_abort(job_id))}
         for sq in search_queries:
-            if _check_abort(job_id): raise InterruptedError("Aborted")
-            batch = search_dark_web(sq, max_workers=threads, num_engines=num_engines, check_abort=lambda: _check_abort(job_id))
-            for item in batch:
+            for item in batches.get(sq, []):
                 url = item["url"] if isinstance(item, dict) else item
                 if url not in seen_urls:
                     seen_urls.add(url)
@@ -332,21 +368,31 @@ def _run_pipeline(job_id: str, query: str, config: dict):
 
         if _check_abort(job_id): raise InterruptedError("Aborted")
 
-        all_iocs = extract_iocs_from_scraped(scraped_data)
-        all_contacts = extract_contacts_from_scraped(scraped_data)
+        # regex IOC extraction only reads scraped_data — run it in the
+        # background so its CPU cost hides behind the categorization
+        # LLM round trip on AI jobs (same overlap as main.py)
+        _extract_pool = ThreadPoolExecutor(max_workers=1)
+        extract_future = _extract_pool.submit(extract_all_from_scraped, scraped_data)
 
         summary = ""
         company_categories = {}
-        if use_ai:
-            if _check_abort(job_id): raise InterruptedError("Aborted")
+        try:
+            if use_ai:
+                if _check_abort(job_id): raise InterruptedError("Aborted")
 
-            with _job_lock:
-                _jobs[job_id]["progress"] = "categorizing"
-                _jobs[job_id].setdefault("stage_times", {})["categorizing"] = time.time()
+                with _job_lock:
+                    _jobs[job_id]["progress"] = "categorizing"
+                    _jobs[job_id].setdefault("stage_times", {})["categorizing"] = time.time()
+
+                from ai_engine import categorize_company_relevance, classify_threats, generate_summary
+                company_categories = categorize_company_relevance(query, scraped_data)
 
-            from ai_engine import categorize_company_relevance, classify_threats, generate_summary
-            company_categories = categorize_company_relevance(query, scraped_data)
+            all_iocs, all_contacts = extract_future.result()
+        finally:
+            # don't leak the worker thread when an abort bubbles out
+            _extract_pool.shutdown(wait=False)
 
+        if use_ai:
             if _check_abort(job_id): raise InterruptedError("Aborted")
 
             with _job_lock:
@@ -1872,8 +1918,7 @@ def run_pipeline():
         if repeat:
             _schedule_next_run_after_complete(query, config)
 
-    thread = threading.Thread(target=_run_and_maybe_repeat, daemon=True)
-    thread.start()
+    _job_pool.submit(_run_and_maybe_repeat)
 
     return jsonify({"job_id": job_id})
 
@@ -1937,9 +1982,12 @@ def job_logs(job_id):
         job = _jobs.get(job_id)
         if not job:
             return jsonify({"error": "not found"}), 404
-        logs = job.get("logs", [])
-        total = len(logs)
-        new_lines = logs[after:] if after < total else []
+        logs = job.get("logs", ())
+        total = job.get("log_total", len(logs))
+        # map the monotonic cursor onto the retained window — only the
+        # pending lines are copied out under the lock, not the history
+        start = max(after - (total - len(logs)), 0)
+        new_lines = list(islice(logs, start, None)) if after < total else []
     return jsonify({"lines": new_lines, "total": total})
 
 
@@ -2046,6 +2094,11 @@ def list_login_walls():
 
 
 if __name__ == "__main__":
+    # preload the local model in the background so the first pipeline
+    # run doesn't stall on ollama's model load
+    from ai_engine import warm_up_ollama
+    threading.Thread(target=warm_up_ollama, daemon=True).start()
+
     # automation timer is started only when a pipeline run completes with repeat=on
     # (no automatic scheduling on startup — user must click Run Pipeline)
     app.run(host="0.0.0.0", port=5000, debug=True)
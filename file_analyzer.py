@@ -6,7 +6,7 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 from aiohttp import ClientSession, ClientTimeout
 
-from utils import get_proxy_connector, get_browser_headers
+from utils import get_proxy_connector, get_browser_headers, BS_PARSER
 
 # file extensions we care about
 DOWNLOADABLE_EXTENSIONS = {
@@ -132,7 +132,7 @@ def extract_file_links(base_url: str, html: str) -> list:
     filters out navigation links (.php pages, index files, etc.)
     returns list of dicts: [{url, filename, link_text, type}]
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, BS_PARSER)
     files = []
     seen = set()
     
@@ -346,16 +346,15 @@ def _parse_torrent_file(data: bytes) -> dict:
         return {'type': 'torrent_file', 'error': str(e)[:100], 'files': []}
 
 
-async def download_file_header(url: str, stream_id: int) -> dict:
+async def download_file_header(url: str, stream_id: int, session=None) -> dict:
     """
     download only the first 4KB of a file via HTTP Range request.
     returns dict with file type, header preview, and metadata.
+    pass a session to reuse its connection/circuit across files.
     """
-    connector = get_proxy_connector(stream_id)
-    timeout = ClientTimeout(total=15)
-    headers = get_browser_headers()
+    headers = get_browser_headers(stream_id)
     headers['Range'] = f'bytes=0-{HEADER_SIZE - 1}'
-    
+
     result = {
         'url': url,
         'status': 'error',
@@ -364,58 +363,14 @@ async def download_file_header(url: str, stream_id: int) -> dict:
         'header_preview': '',
         'content_type': '',
     }
-    
+
     try:
-        async with ClientSession(connector=connector, timeout=timeout) as session:
-            async with session.get(url, headers=headers) as response:
-                # accept both 200 (full file) and 206 (partial content)
-                if response.status not in (200, 206):
-                    result['status'] = f'http_{response.status}'
-                    return result
-                
-                # get content info
-                result['content_type'] = response.headers.get('Content-Type', '')
-                total_size = response.headers.get('Content-Range', '')
-                if total_size:
-                    match = re.search(r'/(\d+)', total_size)
-                    if match:
-                        result['size_bytes'] = int(match.group(1))
-                elif response.headers.get('Content-Length'):
-                    result['size_bytes'] = int(response.headers['Content-Length'])
-                
-                # read only header bytes
-                data = await response.content.read(HEADER_SIZE)
-                
-                # reject HTML pages served by web servers (e.g. .php pages)
-                content_type = result['content_type'].lower()
-                if 'text/html' in content_type:
-                    data_start = data[:100].decode('utf-8', errors='replace').strip().lower()
-                    if data_start.startswith(('<!doctype', '<html', '<head', '<?xml')):
-                        result['file_type'] = 'html_page'
-                        result['status'] = 'skipped_html'
-                        return result
-                
-                # detect type from magic bytes
-                result['file_type'] = detect_file_type(data)
-                result['status'] = 'success'
-                
-                # generate preview
-                try:
-                    text = data.decode('utf-8', errors='replace')
-                    # clean up and truncate for preview
-                    lines = text.split('\n')[:20]  # first 20 lines
-                    result['header_preview'] = '\n'.join(lines)[:2000]
-                except Exception:
-                    # hex dump for binary files
-                    hex_lines = []
-                    for i in range(0, min(len(data), 256), 16):
-                        hex_part = ' '.join(f'{b:02x}' for b in data[i:i+16])
-                        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in data[i:i+16])
-                        hex_lines.append(f'{i:04x}: {hex_part:<48} {ascii_part}')
-                    result['header_preview'] = '\n'.join(hex_lines)
-                
-                return result
-                
+        if session is None:
+            connector = get_proxy_connector(stream_id)
+            timeout = ClientTimeout(total=15)
+            async with ClientSession(connector=connector, timeout=timeout) as session:
+                return await _read_file_header(session, url, headers, result)
+        return await _read_file_header(session, url, headers, result)
     except asyncio.TimeoutError:
         result['status'] = 'timeout'
         return result
@@ -424,22 +379,79 @@ async def download_file_header(url: str, stream_id: int) -> dict:
         return result
 
 
-async def download_torrent_metadata(url: str, stream_id: int) -> dict:
-    """download a .torrent file and parse its metadata (file listing)"""
-    connector = get_proxy_connector(stream_id)
-    timeout = ClientTimeout(total=15)
-    headers = get_browser_headers()
-    
+async def _read_file_header(session, url: str, headers: dict, result: dict) -> dict:
+    async with session.get(url, headers=headers) as response:
+        # accept both 200 (full file) and 206 (partial content)
+        if response.status not in (200, 206):
+            result['status'] = f'http_{response.status}'
+            return result
+        
+        # get content info
+        result['content_type'] = response.headers.get('Content-Type', '')
+        total_size = response.headers.get('Content-Range', '')
+        if total_size:
+            match = re.search(r'/(\d+)', total_size)
+            if match:
+                result['size_bytes'] = int(match.group(1))
+        elif response.headers.get('Content-Length'):
+            result['size_bytes'] = int(response.headers['Content-Length'])
+        
+        # read only header bytes
+        data = await response.content.read(HEADER_SIZE)
+        
+        # reject HTML pages served by web servers (e.g. .php pages)
+        content_type = result['content_type'].lower()
+        if 'text/html' in content_type:
+            data_start = data[:100].decode('utf-8', errors='replace').strip().lower()
+            if data_start.startswith(('<!doctype', '<html', '<head', '<?xml')):
+                result['file_type'] = 'html_page'
+                result['status'] = 'skipped_html'
+                return result
+        
+        # detect type from magic bytes
+        result['file_type'] = detect_file_type(data)
+        result['status'] = 'success'
+        
+        # generate preview
+        try:
+            text = data.decode('utf-8', errors='replace')
+            # clean up and truncate for preview
+            lines = text.split('\n')[:20]  # first 20 lines
+            result['header_preview'] = '\n'.join(lines)[:2000]
+        except Exception:
+            # hex dump for binary files
+            hex_lines = []
+            for i in range(0, min(len(data), 256), 16):
+                hex_part = ' '.join(f'{b:02x}' for b in data[i:i+16])
+                ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in data[i:i+16])
+                hex_lines.append(f'{i:04x}: {hex_part:<48} {ascii_part}')
+            result['header_preview'] = '\n'.join(hex_lines)
+        
+        return result
+
+
+async def download_torrent_metadata(url: str, stream_id: int, session=None) -> dict:
+    """download a .torrent file and parse its metadata (file listing).
+    pass a session to reuse its connection/circuit across files."""
+    headers = get_browser_headers(stream_id)
+
+    async def _fetch(sess):
+        async with sess.get(url, headers=headers) as response:
+            if response.status != 200:
+                return {'type': 'torrent_file', 'error': f'HTTP {response.status}', 'files': []}
+
+            # torrent files are small, but cap at 1MB
+            data = await response.content.read(1024 * 1024)
+            return _parse_torrent_file(data)
+
     try:
+        if session is not None:
+            return await _fetch(session)
+        connector = get_proxy_connector(stream_id)
+        timeout = ClientTimeout(total=15)
         async with ClientSession(connector=connector, timeout=timeout) as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    return {'type': 'torrent_file', 'error': f'HTTP {response.status}', 'files': []}
-                
-                # torrent files are small, but cap at 1MB
-                data = await response.content.read(1024 * 1024)
-                return _parse_torrent_file(data)
-                
+            return await _fetch(session)
+
     except Exception as e:
         return {'type': 'torrent_file', 'error': str(e)[:80], 'files': []}
 
@@ -508,41 +520,56 @@ async def analyze_threat_files_async(
     
     print(f"\n  [*] Sampling headers from {total_files} files...")
     
-    # download headers and torrent metadata
-    semaphore = asyncio.Semaphore(max_workers)
+    # download headers and torrent metadata with a small worker pool.
+    # each worker owns one session (and Tor circuit) for every file it
+    # pulls, so files on the same host ride a warm connection instead of
+    # paying a fresh circuit build per file. stream ids are offset to
+    # avoid collision with scrape circuits.
     results = {}
-    stream_counter = 100  # offset to avoid collision with scrape circuits
-    
-    async def limited_analyze(file_info, sid):
-        async with semaphore:
-            url = file_info['url']
-            ftype = file_info['type']
-            
-            # check if file extension alone makes it a threat
-            ext = os.path.splitext(file_info['filename'])[1].lower()
-            threat_flag = ext in THREAT_BY_EXISTENCE
-            
-            if ftype == 'magnet':
-                result = _extract_magnet_metadata(url)
-            elif ftype == 'torrent':
-                result = await download_torrent_metadata(url, sid)
-            else:
-                result = await download_file_header(url, sid)
-            
-            if isinstance(result, dict):
-                result['threat_by_type'] = threat_flag
-                result['extension'] = ext
-                result['link_text'] = file_info.get('link_text', '')
-            
-            return file_info['url'], result
-    
-    tasks = []
+    queue = asyncio.Queue()
     for page_url, links in all_file_links.items():
         for file_info in links:
-            tasks.append(limited_analyze(file_info, stream_counter))
-            stream_counter += 1
-    
-    task_results = await asyncio.gather(*tasks, return_exceptions=True)
+            queue.put_nowait(file_info)
+
+    task_results = []
+
+    async def analyze_worker(worker_id):
+        sid = 100 + worker_id
+        connector = get_proxy_connector(sid)
+        timeout = ClientTimeout(total=15)
+        async with ClientSession(connector=connector, timeout=timeout) as session:
+            while True:
+                try:
+                    file_info = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                url = file_info['url']
+                ftype = file_info['type']
+
+                # check if file extension alone makes it a threat
+                ext = os.path.splitext(file_info['filename'])[1].lower()
+                threat_flag = ext in THREAT_BY_EXISTENCE
+
+                try:
+                    if ftype == 'magnet':
+                        result = _extract_magnet_metadata(url)
+                    elif ftype == 'torrent':
+                        result = await download_torrent_metadata(url, sid, session=session)
+                    else:
+                        result = await download_file_header(url, sid, session=session)
+                except Exception:
+                    continue
+
+                if isinstance(result, dict):
+                    result['threat_by_type'] = threat_flag
+                    result['extension'] = ext
+                    result['link_text'] = file_info.get('link_text', '')
+
+                task_results.append((url, result))
+
+    num_workers = min(max_workers, queue.qsize())
+    await asyncio.gather(*(analyze_worker(i) for i in range(num_workers)))
     
     for result in task_results:
         if isinstance(result, tuple):
@@ -17,7 +17,7 @@ from bs4 import BeautifulSoup
 from aiohttp import ClientSession, ClientTimeout, CookieJar
 from aiohttp_socks import ProxyConnector
 
-from utils import TOR_PROXY_HOST, TOR_PROXY_PORT, get_browser_headers
+from utils import TOR_PROXY_HOST, TOR_PROXY_PORT, get_browser_headers, BS_PARSER
 
 import functools
 import sys
@@ -216,7 +216,7 @@ class CaptchaSolver:
                 return {"type": "recaptcha_v2", "sitekey": sitekey}
 
         # image captcha (common patterns)
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, BS_PARSER)
         captcha_img = None
 
         # look for captcha images
@@ -414,7 +414,7 @@ def extract_csrf_token(html: str) -> dict:
     extract CSRF/security tokens from forms.
     returns dict of {field_name: value} for all hidden inputs.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, BS_PARSER)
     tokens = {}
 
     # find hidden inputs in forms (csrf tokens, security tokens, etc.)
@@ -481,7 +481,7 @@ class ForumSession:
         parse login form from HTML.
         returns {action, method, fields: {name: value}, username_field, password_field} or None.
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, BS_PARSER)
         forum_type = self.detect_forum_type(html)
 
         # find forms with password inputs
@@ -560,7 +560,7 @@ class ForumSession:
         returns {action, fields, username_field, password_field, email_field, captcha_info} or None.
         when skip_links=True, only scans forms (used when we already followed a registration link).
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, BS_PARSER)
 
         # find registration links first (skip when we're already on a registration page)
         if not skip_links:
@@ -680,7 +680,7 @@ class ForumSession:
         if not html:
             return False
 
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, BS_PARSER)
 
         # positive indicators (logged in)
         logged_in_patterns = [
@@ -736,7 +736,7 @@ class ForumSession:
         # if no login form on this page, try to find and follow login links
         if not login_form:
             login_url = None
-            soup = BeautifulSoup(html, "html.parser")
+            soup = BeautifulSoup(html, BS_PARSER)
 
             # look for login links on the page
             for a in soup.find_all("a", href=True):
@@ -814,7 +814,7 @@ class ForumSession:
                         post_data["g-recaptcha-response"] = solution  # some forums use this name for hcaptcha too
                     else:
                         # find the captcha input field name
-                        soup = BeautifulSoup(html, "html.parser")
+                        soup = BeautifulSoup(html, BS_PARSER)
                         captcha_input = soup.find("input", {"name": re.compile(r'captcha|verify|code|answer', re.IGNORECASE)})
                         if captcha_input:
                             post_data[captcha_input["name"]] = solution
@@ -1033,7 +1033,7 @@ class ForumSession:
                         post_data["g-recaptcha-response"] = solution
                     else:
                         # find the captcha input field
-                        soup = BeautifulSoup(html, "html.parser")
+                        soup = BeautifulSoup(html, BS_PARSER)
                         captcha_input = soup.find("input", {"name": re.compile(r'captcha|verify|code|answer', re.IGNORECASE)})
                         if captcha_input:
                             post_data[captcha_input["name"]] = solution
@@ -1044,7 +1044,7 @@ class ForumSession:
                 return None
 
         # check for agreement/TOS checkboxes and auto-accept
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, BS_PARSER)
         for inp in soup.find_all("input", {"type": "checkbox"}):
             name = inp.get("name", "").lower()
             if any(kw in name for kw in ["agree", "tos", "terms", "rules", "accept", "policy"]):
@@ -1208,8 +1208,18 @@ def is_login_wall(html: str) -> bool:
         if pattern.search(text):
             return True
 
+    # the structural checks below need a parse tree, which is by far the
+    # most expensive part of this function — and it runs on every page
+    # scraped. skip it when the raw html has no password field and no
+    # login/register/sign-in link for those checks to find.
+    lowered = html.lower()
+    if ('type="password"' not in lowered and "type='password'" not in lowered
+            and "login" not in lowered and "register" not in lowered
+            and "sign" not in lowered):
+        return False
+
     # check if page is mostly a login form with very little content
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, BS_PARSER)
 
     # strip scripts, styles
     for elem in soup(["script", "style", "nav", "footer"]):
@@ -1,7 +1,12 @@
+import os
 import re
 import ipaddress
 from urllib.parse import urlparse
 
+# minimum pages before extraction is spread over worker processes —
+# below this the pool startup costs more than the regex work saved
+_PARALLEL_MIN_PAGES = 8
+
 
 # regex patterns for IOC extraction from scraped dark web content
 IOC_PATTERNS = {
@@ -208,15 +213,6 @@ DOMAIN_BLACKLIST = {
     "ajax.googleapis.com", "maps.googleapis.com",
 }
 
-# private/reserved IP ranges to exclude
-PRIVATE_IP_NETWORKS = [
-    ipaddress.ip_network('10.0.0.0/8'),
-    ipaddress.ip_network('127.0.0.0/8'),
-    ipaddress.ip_network('172.16.0.0/12'),
-    ipaddress.ip_network('192.168.0.0/16'),
-    ipaddress.ip_network('169.254.0.0/16'),  # link-local
-    ipaddress.ip_network('0.0.0.0/8'),
-]
 
 # labels that commonly appear before a colon but are NOT credentials
 CREDENTIAL_FALSE_POSITIVE_LABELS = {
@@ -248,6 +244,50 @@ TELEGRAM_FP = {
 JABBER_DOMAIN_FP = {"jabber.org", "xmpp.org"}
 
 
+def _match_contact_positions(text: str) -> dict:
+    """
+    single matching pass over the page: contact_type -> {value: first offset}.
+    both contact extractors build on this so each pattern runs only once
+    and context extraction can reuse the offsets instead of re-scanning.
+    """
+    found = {}
+    for contact_type, pattern in CONTACT_PATTERNS.items():
+        positions = {}
+        for m in pattern.finditer(text):
+            positions.setdefault(m.group(), m.start())
+        if positions:
+            found[contact_type] = positions
+    return found
+
+
+def _filter_contact_values(contact_type: str, matches: set) -> set:
+    """filter false positives from raw contact matches"""
+    if contact_type == "telegram":
+        cleaned = set()
+        for m in matches:
+            handle = m.strip().lower()
+            username = re.sub(r'^.*[/@]', '', handle)
+            if username not in TELEGRAM_FP and len(username) >= 3:
+                cleaned.add(m.strip())
+        return cleaned
+
+    elif contact_type == "matrix":
+        return {m for m in matches if ":" in m and not m.startswith("@.")}
+
+    elif contact_type == "pgp_fingerprint":
+        return {m for m in matches if len(m.replace(" ", "")) == 40}
+
+    elif contact_type == "forum_handle":
+        cleaned = set()
+        for m in matches:
+            handle_match = re.search(r'@([a-zA-Z0-9_]{3,30})', m)
+            if handle_match:
+                cleaned.add("@" + handle_match.group(1))
+        return cleaned
+
+    return matches
+
+
 def extract_contacts(text: str) -> dict:
     """
     extract threat actor contact methods from text.
@@ -255,47 +295,27 @@ def extract_contacts(text: str) -> dict:
     """
     contacts = {}
 
-    for contact_type, pattern in CONTACT_PATTERNS.items():
-        matches = set(pattern.findall(text))
-
-        # filter false positives
-        if contact_type == "telegram":
-            cleaned = set()
-            for m in matches:
-                handle = m.strip().lower()
-                username = re.sub(r'^.*[/@]', '', handle)
-                if username not in TELEGRAM_FP and len(username) >= 3:
-                    cleaned.add(m.strip())
-            matches = cleaned
-
-        elif contact_type == "matrix":
-            matches = {m for m in matches if ":" in m and not m.startswith("@.")}
-
-        elif contact_type == "pgp_fingerprint":
-            matches = {m for m in matches if len(m.replace(" ", "")) == 40}
-
-        elif contact_type == "forum_handle":
-            cleaned = set()
-            for m in matches:
-                handle_match = re.search(r'@([a-zA-Z0-9_]{3,30})', m)
-                if handle_match:
-                    cleaned.add("@" + handle_match.group(1))
-            matches = cleaned
-
+    for contact_type, positions in _match_contact_positions(text).items():
+        matches = _filter_contact_values(contact_type, set(positions))
         if matches:
             contacts[contact_type] = sorted(matches)
 
     return contacts
 
 
-def _get_context(text: str, match: str, window: int = 80) -> str:
+def _get_context(text: str, match: str, window: int = 80, text_lower: str = None, pos: int = None) -> str:
     """
     extract surrounding text around a contact match to show what it's associated with.
+    pos is the match offset when already known from the matching pass;
+    text_lower can be passed in to avoid re-lowercasing the page per match.
     returns a cleaned context snippet.
     """
-    pos = text.find(match)
+    if pos is None:
+        pos = text.find(match)
     if pos == -1:
-        pos = text.lower().find(match.lower())
+        if text_lower is None:
+            text_lower = text.lower()
+        pos = text_lower.find(match.lower())
     if pos == -1:
         return ""
 
@@ -325,13 +345,22 @@ def extract_contacts_with_context(text: str, source_url: str = "") -> dict:
     extract contacts AND their surrounding context from text.
     returns dict of contact_type -> list of {value, context} dicts
     """
-    contacts = extract_contacts(text)
+    raw_matches = _match_contact_positions(text)
     enriched = {}
 
-    for contact_type, values in contacts.items():
+    # lowercase the page once — the per-match fallback would otherwise
+    # copy the whole page for every extracted contact
+    text_lower = text.lower() if raw_matches else None
+
+    for contact_type, positions in raw_matches.items():
+        values = _filter_contact_values(contact_type, set(positions))
+        if not values:
+            continue
         enriched[contact_type] = []
-        for val in values:
-            context = _get_context(text, val)
+        for val in sorted(values):
+            # reuse the offset from the matching pass; filtered values
+            # that were rewritten (e.g. forum handles) fall back to find
+            context = _get_context(text, val, text_lower=text_lower, pos=positions.get(val))
             enriched[contact_type].append({
                 "value": val,
                 "context": context,
@@ -344,8 +373,11 @@ def extract_contacts_with_context(text: str, source_url: str = "") -> dict:
 def _is_private_ip(ip_str: str) -> bool:
     """check if an IP address is in a private/reserved range"""
     try:
-        ip = ipaddress.ip_address(ip_str)
-        return any(ip in network for network in PRIVATE_IP_NETWORKS)
+        # is_private is a single table lookup in the ipaddress module and
+        # covers every range the old hand-rolled network loop checked
+        # (rfc1918, loopback, link-local, 0.0.0.0/8) plus the other
+        # reserved blocks that should never appear as real IOCs
+        return ipaddress.ip_address(ip_str).is_private
     except ValueError:
         return False
 
@@ -543,25 +575,57 @@ def extract_iocs(text: str, source_url: str = "") -> dict:
 
 
 
-def extract_iocs_from_scraped(scraped_data: dict) -> dict:
+def _extract_page_iocs(item: tuple) -> tuple:
+    """per-page IOC extraction worker (module-level so it can be pickled)"""
+    url, content = item
+    return url, extract_iocs(content, source_url=url)
+
+
+def _extract_page_contacts(item: tuple) -> tuple:
+    """per-page contact extraction worker (module-level so it can be pickled)"""
+    url, content = item
+    return url, extract_contacts_with_context(content, source_url=url)
+
+
+def _extract_page_all(item: tuple) -> tuple:
+    """per-page combined IOC + contact worker (module-level so it can be pickled)"""
+    url, content = item
+    return url, (extract_iocs(content, source_url=url),
+                 extract_contacts_with_context(content, source_url=url))
+
+
+def _map_pages(worker, scraped_data: dict) -> dict:
     """
-    extract IOCs from all scraped pages.
-    returns dict of url -> {ioc_type: [values]}
+    run a per-page extraction worker over all non-error pages.
+    regex extraction is pure CPU, so large batches are spread over a
+    process pool (threads would serialize on the GIL); small batches
+    and environments without process support fall back to a plain loop.
     """
-    all_iocs = {}
-    total_count = 0
+    pages = [(url, content) for url, content in scraped_data.items()
+             if not content.startswith("[ERROR")]
 
-    for url, content in scraped_data.items():
-        if content.startswith("[ERROR"):
-            continue
+    results = None
+    if len(pages) >= _PARALLEL_MIN_PAGES and (os.cpu_count() or 1) > 1:
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            workers = min(os.cpu_count(), 4, len(pages))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(worker, pages))
+        except Exception:
+            results = None  # pool unavailable — extract serially
 
-        iocs = extract_iocs(content, source_url=url)
-        if iocs:
-            all_iocs[url] = iocs
-            count = sum(len(v) for v in iocs.values())
-            total_count += count
+    if results is None:
+        results = [worker(page) for page in pages]
 
-    return all_iocs
+    return {url: extracted for url, extracted in results if extracted}
+
+
+def extract_iocs_from_scraped(scraped_data: dict) -> dict:
+    """
+    extract IOCs from all scraped pages.
+    returns dict of url -> {ioc_type: [values]}
+    """
+    return _map_pages(_extract_page_iocs, scraped_data)
 
 
 def extract_contacts_from_scraped(scraped_data: dict) -> dict:
@@ -569,17 +633,21 @@ def extract_contacts_from_scraped(scraped_data: dict) -> dict:
     extract threat actor contacts with context from all scraped pages.
     returns dict of url -> {contact_type: [{value, context, source}]}
     """
-    all_contacts = {}
-
-    for url, content in scraped_data.items():
-        if content.startswith("[ERROR"):
-            continue
+    return _map_pages(_extract_page_contacts, scraped_data)
 
-        contacts = extract_contacts_with_context(content, source_url=url)
-        if contacts:
-            all_contacts[url] = contacts
 
-    return all_contacts
+def extract_all_from_scraped(scraped_data: dict) -> tuple:
+    """
+    extract IOCs and threat actor contacts in a single pass over the
+    pages — one worker-pool run instead of two, and each page is only
+    shipped to the workers once.
+    returns (all_iocs, all_contacts) in the same shapes the individual
+    extractors produce.
+    """
+    combined = _map_pages(_extract_page_all, scraped_data)
+    all_iocs = {url: iocs for url, (iocs, _) in combined.items() if iocs}
+    all_contacts = {url: contacts for url, (_, contacts) in combined.items() if contacts}
+    return all_iocs, all_contacts
 
 
 def _onion_url_label(url: str) -> str:
@@ -783,11 +851,12 @@ def format_iocs_summary(all_iocs: dict, all_contacts: dict = None, company_categ
                     val = item["value"] if isinstance(item, dict) else item
                     ctx = item.get("context", "") if isinstance(item, dict) else ""
                     if val not in contact_agg[contact_type]:
-                        contact_agg[contact_type][val] = {"contexts": [], "sources": []}
-                    if ctx and ctx not in contact_agg[contact_type][val]["contexts"]:
-                        contact_agg[contact_type][val]["contexts"].append(ctx)
-                    if url not in contact_agg[contact_type][val]["sources"]:
-                        contact_agg[contact_type][val]["sources"].append(url)
+                        # sets — contacts repeated across many pages made
+                        # the old list-membership scans quadratic
+                        contact_agg[contact_type][val] = {"contexts": set(), "sources": set()}
+                    if ctx:
+                        contact_agg[contact_type][val]["contexts"].add(ctx)
+                    contact_agg[contact_type][val]["sources"].add(url)
 
         if contact_agg:
             contact_labels = {
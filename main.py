@@ -3,9 +3,7 @@ import time
 import argparse
 import functools
 print = functools.partial(print, flush=True)
-from search import search_dark_web, save_results, get_urls_from_results, SEARCH_ENGINES
-from scrape import scrape_all, save_scraped_data
-from ioc_extractor import extract_iocs_from_scraped, extract_contacts_from_scraped, format_iocs_summary
+from search import search_dark_web, search_dark_web_multi, save_results, get_urls_from_results, SEARCH_ENGINES
 
 
 def get_int_input(prompt: str, default: int, min_val: int = 1, max_val: int = None) -> int:
@@ -86,6 +84,11 @@ def main():
             print("[-] Flask not installed. Run: pip install flask")
         return
     
+    # full pipeline run — pull in the scrape/extraction stack only now,
+    # so the special modes above start without loading it
+    from scrape import scrape_all, save_scraped_data
+    from ioc_extractor import extract_all_from_scraped, format_iocs_summary
+
     total_engines = len(SEARCH_ENGINES)
     use_ai = not args.no_ai
     max_pages = min(args.pages, 10)  # cap at 10
@@ -130,16 +133,17 @@ def main():
         print("STEP 1: AI QUERY REFINEMENT")
         print("-" * 50)
         
-        from ai_engine import refine_query
+        from ai_engine import refine_query, dedupe_search_queries
         print(f"[*] Original query: {query}")
         keywords = refine_query(query)
         print(f"[+] AI-generated keywords:")
         for i, kw in enumerate(keywords, 1):
             print(f"    {i}. {kw}")
-        
-        # search all 3 AI keywords + original query for company-specific results
-        search_queries = keywords + [query]
-        print(f"[+] Will search {len(search_queries)} queries (3 AI + original)")
+
+        # search AI keywords + original query, dropping queries another
+        # query already contains — each one costs a full engine round
+        search_queries = dedupe_search_queries(keywords + [query])
+        print(f"[+] Will search {len(search_queries)} queries (AI + original, deduplicated)")
     
     # ==========================================
     # STEP 2: SEARCH DARK WEB
@@ -151,18 +155,19 @@ def main():
     
     all_search_results = []
     seen_urls = set()
-    
+
+    # all queries run in one event loop — engines work in parallel, and
+    # the rate-limit pause between repeat hits on the same engine happens
+    # per engine instead of stalling the whole round
+    if len(search_queries) > 1:
+        batches = search_dark_web_multi(search_queries, max_workers=args.threads, num_engines=num_engines)
+    else:
+        batches = {search_queries[0]: search_dark_web(search_queries[0], max_workers=args.threads, num_engines=num_engines)}
+
+    # merge + dedup in query order
     for i, sq in enumerate(search_queries, 1):
-        # rate limit: delay between keyword searches to avoid getting blocked
-        if i > 1:
-            print(f"\n[*] Waiting 3s before next search (rate limit protection)...")
-            time.sleep(3)
-        
+        batch = batches.get(sq, [])
         label = "original" if sq == query and use_ai else f"keyword {i}"
-        print(f"\n[*] Searching [{label}]: '{sq}'")
-        batch = search_dark_web(sq, max_workers=args.threads, num_engines=num_engines)
-        
-        # merge + dedup
         new_count = 0
         for item in batch:
             url = item["url"] if isinstance(item, dict) else item
@@ -170,7 +175,7 @@ def main():
                 seen_urls.add(url)
                 all_search_results.append(item)
                 new_count += 1
-        print(f"  [+] {len(batch)} results ({new_count} new, {len(batch) - new_count} duplicates)")
+        print(f"  [+] [{label}] '{sq}': {len(batch)} results ({new_count} new, {len(batch) - new_count} duplicates)")
     
     search_results = all_search_results
     
@@ -212,29 +217,25 @@ def main():
     scraped_data, html_cache = scrape_all(urls_to_scrape, max_workers=args.threads, depth=args.depth, max_pages=max_pages, target_query=query)
     save_scraped_data(scraped_data)
     
-    # stats
-    success = sum(1 for v in scraped_data.values() if not v.startswith("[ERROR"))
-    dead_links = sum(1 for v in scraped_data.values() if "Dead link" in v)
-    
-    # ==========================================
-    # STEP 4.5: IOC + CONTACT AUTO-EXTRACTION
-    # ==========================================
-    print("\n" + "-" * 50)
-    print("IOC & CONTACT AUTO-EXTRACTION")
-    print("-" * 50)
-    all_iocs = extract_iocs_from_scraped(scraped_data)
-    ioc_count = sum(len(v) for iocs in all_iocs.values() for v in iocs.values())
-    print(f"[+] Extracted {ioc_count} IOCs from {len(all_iocs)} pages")
-    
-    # extract threat actor contacts
-    all_contacts = extract_contacts_from_scraped(scraped_data)
-    contact_count = sum(len(v) for contacts in all_contacts.values() for v in contacts.values())
-    print(f"[+] Extracted {contact_count} threat actor contacts from {len(all_contacts)} pages")
+    # stats — classify each result once instead of scanning the dict per counter
+    success = dead_links = 0
+    for v in scraped_data.values():
+        if not v.startswith("[ERROR"):
+            success += 1
+        elif "Dead link" in v:
+            dead_links += 1
     
     file_analysis = {}
     file_verdicts = {}
     company_categories = {}
-    
+
+    # regex IOC extraction is CPU-bound and shares nothing with the
+    # company check's LLM round trip — start it in the background and
+    # join once the categorization is done
+    from concurrent.futures import ThreadPoolExecutor
+    _extract_pool = ThreadPoolExecutor(max_workers=1)
+    extract_future = _extract_pool.submit(extract_all_from_scraped, scraped_data)
+
     if use_ai and success > 0:
         # ==========================================
         # STEP 5: COMPANY CATEGORIZATION
@@ -254,6 +255,19 @@ def main():
             print(f"    Company-Specific: {cs_count}")
             print(f"    General: {gen_count}")
 
+    # ==========================================
+    # STEP 4.5: IOC + CONTACT AUTO-EXTRACTION (ran in background)
+    # ==========================================
+    print("\n" + "-" * 50)
+    print("IOC & CONTACT AUTO-EXTRACTION")
+    print("-" * 50)
+    all_iocs, all_contacts = extract_future.result()
+    _extract_pool.shutdown()
+    ioc_count = sum(len(v) for iocs in all_iocs.values() for v in iocs.values())
+    print(f"[+] Extracted {ioc_count} IOCs from {len(all_iocs)} pages")
+    contact_count = sum(len(v) for contacts in all_contacts.values() for v in contacts.values())
+    print(f"[+] Extracted {contact_count} threat actor contacts from {len(all_contacts)} pages")
+
     # save IOCs + contacts (after company categorization if AI enabled)
     if all_iocs or all_contacts:
         ioc_text = format_iocs_summary(all_iocs, all_contacts, company_categories=company_categories or None)
@@ -383,8 +397,8 @@ def main():
     print("=" * 50)
     print(f"  - Search Query: {query}")
     if use_ai and len(search_queries) > 1:
-        print(f"  - AI Keywords: {', '.join(search_queries[:-1])}")
-        print(f"  - Queries Searched: {len(search_queries)} (3 AI + original)")
+        print(f"  - AI Keywords: {', '.join(sq for sq in search_queries if sq != query)}")
+        print(f"  - Queries Searched: {len(search_queries)} (AI + original, deduplicated)")
     print(f"  - Search Engines: {num_engines}/{total_engines}")
     print(f"  - Concurrent Tasks: {args.threads}")
     print(f"  - AI Pipeline: {'ENABLED' if use_ai else 'DISABLED'}")
@@ -1,462 +1,557 @@
-import os
-import json
-import asyncio
-from datetime import datetime
-from bs4 import BeautifulSoup
-from aiohttp import ClientSession, ClientTimeout
-
-from utils import (
-    get_browser_headers, get_proxy_connector, sanitize_error,
-    ERROR_MESSAGES,
-)
-
-import functools
-print = functools.partial(print, flush=True)
-
-# forum authentication
-from forum_auth import is_login_wall, get_forum_session, extract_domain
-
-# ── login wall tracking ──
-_LOGIN_WALLS_FILE = os.path.join("output", "login_walls.json")
-
-def _load_login_walls() -> list:
-    if os.path.isfile(_LOGIN_WALLS_FILE):
-        try:
-            with open(_LOGIN_WALLS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, ValueError):
-            pass
-    return []
-
-def _save_login_wall(url: str, status: str):
-    """Append a login-wall detection entry. status = 'auth_success' | 'auth_failed'"""
-    os.makedirs("output", exist_ok=True)
-    walls = _load_login_walls()
-    # avoid duplicate URLs — update status if already tracked
-    for entry in walls:
-        if entry["url"] == url:
-            entry["status"] = status
-            entry["last_seen"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(_LOGIN_WALLS_FILE, "w", encoding="utf-8") as f:
-                json.dump(walls, f, indent=2)
-            return
-    walls.append({
-        "url": url,
-        "domain": extract_domain(url),
-        "status": status,
-        "first_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "last_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-    })
-    with open(_LOGIN_WALLS_FILE, "w", encoding="utf-8") as f:
-        json.dump(walls, f, indent=2)
-
-def get_login_walls() -> list:
-    """Public accessor for tracked login walls."""
-    return _load_login_walls()
-
-
-async def check_url_alive(url: str, stream_id: int) -> bool:
-    # quick HEAD check before doing full scrape
-    connector = get_proxy_connector(stream_id)
-    timeout = ClientTimeout(total=10)
-    headers = get_browser_headers()
-    
-    try:
-        async with ClientSession(connector=connector, timeout=timeout) as session:
-            async with session.head(url, headers=headers, allow_redirects=True) as response:
-                return response.status < 400
-    except:
-        return True  # if HEAD fails just try GET anyway
-
-
-async def scrape_url(url: str, stream_id: int, target_query: str = "") -> tuple:
-    print(f"  [*] Checking: {url[:45]}... (circuit {stream_id})")
-    is_alive = await check_url_alive(url, stream_id)
-    
-    if not is_alive:
-        print(f"  [!] Dead link: {url[:45]}...")
-        return url, ERROR_MESSAGES["dead_link"], [], ''
-    
-    connector = get_proxy_connector(stream_id)
-    timeout = ClientTimeout(total=45)
-    headers = get_browser_headers()
-    
-    try:
-        print(f"  [*] Scraping: {url[:45]}...")
-        
-        async with ClientSession(connector=connector, timeout=timeout) as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    
-                    # --- LOGIN WALL DETECTION ---
-                    if is_login_wall(html):
-                        print(f"  [AUTH] Login wall detected on {url[:45]}...")
-                        auth_html = await _try_authenticated_scrape(url, stream_id, html, target_query=target_query)
-                        if auth_html:
-                            html = auth_html
-                            print(f"  [AUTH] ✓ Got authenticated content for {url[:45]}...")
-                            _save_login_wall(url, "auth_success")
-                        else:
-                            print(f"  [AUTH] ✗ Could not authenticate for {url[:45]}...")
-                            _save_login_wall(url, "auth_failed")
-                            return url, ERROR_MESSAGES["auth_required"], [], html
-                    
-                    soup = BeautifulSoup(html, "html.parser")
-                    
-                    # extract sublinks before stripping elements (for depth scraping)
-                    sublinks = _extract_sublinks(url, soup)
-                    
-                    # strip out scripts, styles, nav etc
-                    for element in soup(["script", "style", "nav", "footer", "header"]):
-                        element.extract()
-                    
-                    text = soup.get_text(separator=' ')
-                    text = ' '.join(text.split())
-                    
-                    print(f"  [+] Success: {url[:45]}... ({len(text)} chars, {len(sublinks)} sublinks)")
-                    return url, text, sublinks, html
-                else:
-                    return url, f"[ERROR: HTTP {response.status}]", [], ''
-                    
-    except asyncio.TimeoutError:
-        return url, ERROR_MESSAGES["timeout"], [], ''
-    except Exception as e:
-        return url, sanitize_error(e), [], ''
-
-
-async def _try_authenticated_scrape(url: str, stream_id: int, original_html: str, target_query: str = "") -> str:
-    """
-    attempt to authenticate and re-fetch a login-walled page.
-    if target_query is provided and the forum type is known, performs an
-    internal forum search instead of re-fetching the homepage.
-    returns the authenticated HTML on success, None on failure.
-    """
-    forum_session = get_forum_session()
-    
-    try:
-        auth_session, success = await forum_session.get_authenticated_session(url, stream_id + 1000)
-        
-        if success:
-            # detect forum type for potential internal search
-            forum_type = forum_session.detect_forum_type(original_html)
-
-            # try internal forum search if we have a query and known forum type
-            if target_query and forum_type != "generic":
-                search_html = await forum_session.search_forum(auth_session, url, target_query, forum_type)
-                if search_html and not is_login_wall(search_html):
-                    print(f"  [AUTH] Forum search returned results for {url[:45]}...")
-                    return search_html
-                else:
-                    print(f"  [AUTH] Forum search failed or still walled, falling back to page re-fetch")
-
-            # fallback: re-fetch the page with authenticated session
-            headers = get_browser_headers()
-            try:
-                async with auth_session.get(url, headers=headers) as resp:
-                    if resp.status == 200:
-                        html = await resp.text()
-                        # verify we're past the login wall
-                        if not is_login_wall(html):
-                            return html
-                        else:
-                            print(f"  [AUTH] Still behind login wall after authentication")
-                            return None
-            except Exception as e:
-                print(f"  [AUTH] Re-fetch failed: {str(e)[:60]}")
-                return None
-        
-        return None
-    except Exception as e:
-        print(f"  [AUTH] Authentication flow error: {str(e)[:60]}")
-        return None
-
-
-async def scrape_url_paginated(url: str, stream_id: int, max_pages: int = 1, target_query: str = "") -> tuple:
-    """scrape a URL and follow pagination links up to max_pages."""
-    all_text = ""
-    all_sublinks = []
-    raw_html = ""
-    current_url = url
-    visited_pages = set()
-    
-    for page_num in range(max_pages):
-        if current_url in visited_pages:
-            break
-        visited_pages.add(current_url)
-        
-        result_url, text, sublinks, html = await scrape_url(current_url, stream_id + page_num, target_query=target_query)
-        
-        if text.startswith("[ERROR"):
-            if page_num == 0:
-                return url, text, sublinks, html
-            break
-        
-        all_text += ("\n\n" if all_text else "") + text
-        all_sublinks.extend(sublinks)
-        if page_num == 0:
-            raw_html = html  # only cache first page HTML
-        
-        # detect next page
-        if max_pages > 1 and html:
-            soup = BeautifulSoup(html, "html.parser")
-            next_url = _detect_next_page(soup, current_url)
-            if next_url and next_url not in visited_pages:
-                print(f"    [→] Following page {page_num + 2}: {next_url[:45]}...")
-                current_url = next_url
-            else:
-                break
-        else:
-            break
-    
-    return url, all_text, all_sublinks, raw_html
-
-
-def _extract_sublinks(parent_url: str, soup) -> list:
-    """extract same-domain sublinks from a page, capped at 5 per page to prevent bloat"""
-    import re as _re
-    
-    # get base domain of parent
-    domain_match = _re.search(r'https?://([a-z0-9\.]+\.onion)', parent_url)
-    if not domain_match:
-        return []
-    parent_domain = domain_match.group(1)
-    
-    sublinks = []
-    seen = set()
-    
-    for a in soup.find_all('a', href=True):
-        href = a['href']
-        
-        # resolve relative urls
-        if href.startswith('/'):
-            href = f"http://{parent_domain}{href}"
-        
-        # only follow same-domain .onion links
-        if parent_domain not in href:
-            continue
-        
-        # skip search, login, nav, and generic forum pages with no intel value
-        skip_patterns = [
-            # auth/session
-            'login', 'register', 'signup', 'logout', 'sign-in', 'sign-up',
-            'forgot-password', 'reset-password', 'account/create',
-            # navigation / meta
-            'javascript:', 'mailto:', '#',
-            '?page=', '?sort=', '?order=', '?direction=',
-            # forum generic pages
-            '/whats-new', '/what-s-new', '/members', '/notable',
-            '/rules', '/help', '/faq', '/contact', '/about',
-            '/terms', '/privacy', '/tos', '/guidelines',
-            '/staff', '/moderators', '/admin',
-            '/install', '/upgrade',
-            '/latest', '/categories', '/tags',
-            '/search', '/find-threads',
-            # social / share
-            '/share', '/tweet', '/like',
-            # static assets
-            '.css', '.js', '.png', '.jpg', '.gif', '.svg', '.ico',
-        ]
-        if any(p in href.lower() for p in skip_patterns):
-            continue
-        
-        clean = href.rstrip('/')
-        if clean not in seen and clean != parent_url.rstrip('/'):
-            seen.add(clean)
-            sublinks.append(clean)
-        
-        if len(sublinks) >= 5:  # cap at 5 sublinks per page
-            break
-    
-    return sublinks
-
-
-def _detect_next_page(soup, current_url: str) -> str:
-    """detect pagination 'next page' link. returns URL or None."""
-    import re as _re
-    from urllib.parse import urljoin
-    
-    # method 1: rel="next" link
-    link = soup.find('a', rel='next')
-    if link and link.get('href'):
-        return urljoin(current_url, link['href'])
-    
-    # method 2: link text patterns
-    next_patterns = ['next', 'next page', '»', '›', '→', '>>']
-    for a in soup.find_all('a', href=True):
-        text = a.get_text(strip=True).lower()
-        if text in next_patterns:
-            href = urljoin(current_url, a['href'])
-            if href != current_url:
-                return href
-    
-    # method 3: page number sequence (find current page, get next)
-    pagination = soup.find(['nav', 'div', 'ul'], class_=_re.compile(r'pag', _re.IGNORECASE))
-    if pagination:
-        links = pagination.find_all('a', href=True)
-        active = pagination.find(['span', 'strong', 'li'], class_=_re.compile(r'active|current', _re.IGNORECASE))
-        if active:
-            active_text = active.get_text(strip=True)
-            if active_text.isdigit():
-                next_num = str(int(active_text) + 1)
-                for a in links:
-                    if a.get_text(strip=True) == next_num:
-                        return urljoin(current_url, a['href'])
-    
-    return None
-
-
-def load_urls(filename: str = "output/results.txt") -> list:
-    try:
-        with open(filename, "r", encoding="utf-8") as f:
-            urls = []
-            for line in f:
-                line = line.strip()
-                if line:
-                    # handle new format: "url | title"
-                    url = line.split(" | ")[0].strip()
-                    urls.append(url)
-        return urls
-    except FileNotFoundError:
-        print(f"[-] File not found: {filename}")
-        return []
-
-
-async def scrape_all_async(urls: list, max_workers: int = 3, depth: int = 1, max_pages: int = 1, check_abort: callable = None, target_query: str = "") -> tuple:
-    """
-    scrape urls with optional depth control and pagination.
-    depth=1: landing page only (default, backward compatible)
-    depth=2: follow up to 5 sublinks per page (1 level deep)
-    max_pages: follow pagination up to N pages per URL (default: 1 = no pagination)
-    
-    loop protection:
-    - visited set prevents re-scraping same url
-    - same-domain only (no cross-site following)
-    - max 5 sublinks per page
-    - strict depth cap
-    
-    returns (scraped_data, html_cache) tuple
-    """
-    print(f"\n[+] Scraping {len(urls)} URLs with {max_workers} concurrent tasks...")
-    print(f"[+] Circuit isolation: ENABLED | HEAD pre-checks: ENABLED")
-    print(f"[+] Depth: {depth} {'(sublinks enabled)' if depth > 1 else '(landing page only)'}")
-    if max_pages > 1:
-        print(f"[+] Pagination: up to {max_pages} pages per URL")
-    print()
-    
-    semaphore = asyncio.Semaphore(max_workers)
-    visited = set()
-    results = {}
-    html_cache = {}
-    
-    async def limited_scrape(url, stream_id):
-        if check_abort and check_abort():
-            raise InterruptedError("Aborted by user")
-        async with semaphore:
-            if check_abort and check_abort():
-                raise InterruptedError("Aborted by user")
-            # pass check_abort down if possible, but scrape_url_paginated isn't wired for it so we just check at task level
-            return await scrape_url_paginated(url, stream_id, max_pages=max_pages, target_query=target_query)
-    
-    # depth 1: scrape initial urls
-    tasks = []
-    for i, url in enumerate(urls):
-        clean = url.rstrip('/')
-        if clean not in visited:
-            visited.add(clean)
-            tasks.append(limited_scrape(url, i))
-    
-    results_list = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    all_sublinks = []
-    for i, result in enumerate(results_list):
-        if isinstance(result, tuple):
-            url, content, sublinks, raw_html = result
-            results[url] = content
-            if raw_html:
-                html_cache[url] = raw_html
-            if depth > 1 and sublinks:
-                all_sublinks.extend(sublinks)
-        elif isinstance(result, InterruptedError):
-            print("\n  [!] Scraping aborted early. Saving partial results...")
-            break
-        elif isinstance(result, Exception):
-            results[urls[i]] = f"[ERROR: {str(result)[:100]}]"
-    
-    if check_abort and check_abort():
-        return results, html_cache
-    
-    # depth 2: follow sublinks (if depth > 1)
-    if depth > 1 and all_sublinks:
-        # filter out already visited
-        new_sublinks = [u for u in all_sublinks if u.rstrip('/') not in visited]
-        
-        if new_sublinks:
-            print(f"\n[+] Depth 2: following {len(new_sublinks)} sublinks...")
-            
-            sub_tasks = []
-            for i, url in enumerate(new_sublinks):
-                clean = url.rstrip('/')
-                if clean not in visited:
-                    visited.add(clean)
-                    sub_tasks.append(limited_scrape(url, i + len(urls)))
-            
-            sub_results = await asyncio.gather(*sub_tasks, return_exceptions=True)
-            
-            for i, result in enumerate(sub_results):
-                if isinstance(result, tuple):
-                    url, content, _, raw_html = result  # ignore sublinks at depth 2
-                    results[url] = content
-                    if raw_html:
-                        html_cache[url] = raw_html
-                elif isinstance(result, Exception):
-                    results[new_sublinks[i]] = f"[ERROR: {str(result)[:100]}]"
-            
-            print(f"[+] Depth 2 complete: scraped {len(sub_results)} additional pages")
-    
-    # cleanup forum sessions
-    try:
-        forum_session = get_forum_session()
-        await forum_session.close_all()
-    except Exception:
-        pass
-    
-    return results, html_cache
-
-
-def scrape_all(urls: list, max_workers: int = 3, depth: int = 1, max_pages: int = 1, check_abort: callable = None, target_query: str = "") -> tuple:
-    """returns (scraped_data, html_cache) tuple"""
-    return asyncio.run(scrape_all_async(urls, max_workers, depth, max_pages=max_pages, check_abort=check_abort, target_query=target_query))
-
-
-def save_scraped_data(results: dict, filename: str = "output/scraped_data.txt"):
-    os.makedirs("output", exist_ok=True)
-    
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write("## 🕸 Dark Web Scraped Data\n\n")
-        f.write(f"**{len(results)} pages scraped**\n\n")
-        f.write("---\n\n")
-        
-        for i, (url, content) in enumerate(results.items(), 1):
-            f.write(f"### [{i}] {url}\n\n")
-            # Truncate extremely long content for readability
-            display = content if len(content) <= 15000 else content[:15000] + "\n\n*... content truncated (full data preserved in raw scrape) ...*"
-            f.write(display + "\n\n")
-            f.write("---\n\n")
-    
-    print(f"\n[+] Saved scraped data to {filename}")
-
-
-if __name__ == "__main__":
-    urls = load_urls()
-    if urls:
-        print(f"[+] Loaded {len(urls)} URLs from output/results.txt")
-        results = scrape_all(urls)
-        save_scraped_data(results)
-        
-        success = sum(1 for v in results.values() if not v.startswith("[ERROR"))
-        dead_links = sum(1 for v in results.values() if "Dead link" in v)
-        print(f"[+] Successfully scraped {success}/{len(urls)} pages")
-        print(f"[+] Dead links skipped: {dead_links}")
-    else:
-        print("[-] No URLs to scrape. Run search.py first.")
+import os
+import re
+import json
+import asyncio
+from urllib.parse import urljoin
+from datetime import datetime
+from bs4 import BeautifulSoup
+from aiohttp import ClientSession, ClientTimeout
+
+from utils import (
+    get_browser_headers, get_proxy_connector, sanitize_error,
+    ERROR_MESSAGES, BS_PARSER,
+)
+
+import functools
+print = functools.partial(print, flush=True)
+
+# forum authentication
+from forum_auth import is_login_wall, get_forum_session, extract_domain
+
+# skip search, login, nav, and generic forum pages with no intel value
+SUBLINK_SKIP_PATTERNS = [
+    # auth/session
+    'login', 'register', 'signup', 'logout', 'sign-in', 'sign-up',
+    'forgot-password', 'reset-password', 'account/create',
+    # navigation / meta
+    'javascript:', 'mailto:', '#',
+    '?page=', '?sort=', '?order=', '?direction=',
+    # forum generic pages
+    '/whats-new', '/what-s-new', '/members', '/notable',
+    '/rules', '/help', '/faq', '/contact', '/about',
+    '/terms', '/privacy', '/tos', '/guidelines',
+    '/staff', '/moderators', '/admin',
+    '/install', '/upgrade',
+    '/latest', '/categories', '/tags',
+    '/search', '/find-threads',
+    # social / share
+    '/share', '/tweet', '/like',
+    # static assets
+    '.css', '.js', '.png', '.jpg', '.gif', '.svg', '.ico',
+]
+
+# optional: pyahocorasick gives a single linear scan over each href
+# instead of one substring scan per pattern
+try:
+    import ahocorasick
+    _SKIP_AUTOMATON = ahocorasick.Automaton()
+    for _p in SUBLINK_SKIP_PATTERNS:
+        _SKIP_AUTOMATON.add_word(_p, _p)
+    _SKIP_AUTOMATON.make_automaton()
+except ImportError:
+    _SKIP_AUTOMATON = None
+
+
+def _is_skippable_link(href_lower: str) -> bool:
+    """check a lowercased href against the skip patterns in one pass."""
+    if _SKIP_AUTOMATON is not None:
+        return next(_SKIP_AUTOMATON.iter(href_lower), None) is not None
+    return any(p in href_lower for p in SUBLINK_SKIP_PATTERNS)
+
+# ── login wall tracking ──
+_LOGIN_WALLS_FILE = os.path.join("output", "login_walls.json")
+
+# login-wall detections are collected in memory during a scrape and
+# flushed to disk once per run — rewriting the whole JSON file from
+# inside the event loop for every detection blocked all other fetches
+_login_walls_cache = None
+_login_walls_dirty = False
+
+def _load_login_walls() -> list:
+    global _login_walls_cache
+    if _login_walls_cache is None:
+        _login_walls_cache = []
+        if os.path.isfile(_LOGIN_WALLS_FILE):
+            try:
+                with open(_LOGIN_WALLS_FILE, "r", encoding="utf-8") as f:
+                    _login_walls_cache = json.load(f)
+            except (json.JSONDecodeError, ValueError):
+                pass
+    return _login_walls_cache
+
+def _save_login_wall(url: str, status: str):
+    """Record a login-wall detection entry. status = 'auth_success' | 'auth_failed'"""
+    global _login_walls_dirty
+    walls = _load_login_walls()
+    _login_walls_dirty = True
+    # avoid duplicate URLs — update status if already tracked
+    for entry in walls:
+        if entry["url"] == url:
+            entry["status"] = status
+            entry["last_seen"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            return
+    walls.append({
+        "url": url,
+        "domain": extract_domain(url),
+        "status": status,
+        "first_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "last_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
+def _flush_login_walls():
+    """write buffered login-wall entries out in one shot"""
+    global _login_walls_dirty
+    if not _login_walls_dirty:
+        return
+    _login_walls_dirty = False
+    os.makedirs("output", exist_ok=True)
+    with open(_LOGIN_WALLS_FILE, "w", encoding="utf-8") as f:
+        json.dump(_login_walls_cache, f, indent=2)
+
+def get_login_walls() -> list:
+    """Public accessor for tracked login walls."""
+    return _load_login_walls()
+
+
+# no HEAD pre-check anymore: many .onion services don't support HEAD
+# (the old check treated any failure as alive), so live pages paid a
+# second full Tor round-trip for nothing. a tight sock_connect fails
+# fast on dead hosts instead, and sock_read catches stalled responses
+# well before the total budget.
+_SCRAPE_TIMEOUT = ClientTimeout(total=45, sock_connect=8, sock_read=15)
+
+# cap how much of a page body gets read and parsed — the occasional
+# multi-megabyte dump listing would otherwise dominate parse time and
+# memory. 2MB keeps effectively every real page intact for downstream
+# IOC extraction while bounding the pathological case.
+_MAX_HTML_BYTES = 2 * 1024 * 1024
+
+# page-text cleanup: elements stripped before text extraction, and one
+# precompiled whitespace pass instead of split/join tokenizing the full
+# page text twice
+_STRIP_TAGS = ("script", "style", "nav", "footer", "header")
+_WS_RE = re.compile(r'\s+')
+
+
+async def _scrape_with_session(session, url: str, stream_id: int, target_query: str, find_next: bool, headers: dict) -> tuple:
+    print(f"  [*] Scraping: {url[:45]}... (circuit {stream_id})")
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 200:
+            raw = await response.content.read(_MAX_HTML_BYTES + 1)
+            if len(raw) > _MAX_HTML_BYTES:
+                print(f"  [!] Oversized page, parsing first {_MAX_HTML_BYTES // 1024}KB: {url[:45]}...")
+                raw = raw[:_MAX_HTML_BYTES]
+            html = raw.decode(response.charset or "utf-8", errors="replace")
+
+            # --- LOGIN WALL DETECTION ---
+            if is_login_wall(html):
+                print(f"  [AUTH] Login wall detected on {url[:45]}...")
+                auth_html = await _try_authenticated_scrape(url, stream_id, html, target_query=target_query)
+                if auth_html:
+                    html = auth_html
+                    print(f"  [AUTH] ✓ Got authenticated content for {url[:45]}...")
+                    _save_login_wall(url, "auth_success")
+                else:
+                    print(f"  [AUTH] ✗ Could not authenticate for {url[:45]}...")
+                    _save_login_wall(url, "auth_failed")
+                    return url, ERROR_MESSAGES["auth_required"], [], html, None
+
+            # parse off the event loop so other workers keep fetching
+            # while this page's DOM is being walked
+            loop = asyncio.get_running_loop()
+            text, sublinks, next_url = await loop.run_in_executor(
+                None, _parse_page, url, html, find_next)
+
+            print(f"  [+] Success: {url[:45]}... ({len(text)} chars, {len(sublinks)} sublinks)")
+            return url, text, sublinks, html, next_url
+        else:
+            return url, f"[ERROR: HTTP {response.status}]", [], '', None
+
+
+def _parse_page(url: str, html: str, find_next: bool) -> tuple:
+    """CPU-bound page parse: returns (text, sublinks, next_url).
+    runs in a thread via run_in_executor — keep it free of loop state."""
+    soup = BeautifulSoup(html, BS_PARSER)
+
+    # extract sublinks before stripping elements (for depth scraping)
+    sublinks = _extract_sublinks(url, soup)
+
+    # detect pagination on the same tree, before the nav
+    # elements it lives in get stripped below
+    next_url = _detect_next_page(soup, url) if find_next else None
+
+    # strip out scripts, styles, nav etc
+    for element in soup.find_all(_STRIP_TAGS):
+        element.extract()
+
+    text = soup.get_text(separator=' ')
+    text = _WS_RE.sub(' ', text).strip()
+    return text, sublinks, next_url
+
+
+async def scrape_url(url: str, stream_id: int, target_query: str = "", find_next: bool = False, session=None) -> tuple:
+    """scrape one URL. returns (url, text, sublinks, html, next_url).
+    next_url is only detected when find_next is set (pagination mode) —
+    it reuses the page's parse tree so the caller doesn't rebuild one.
+    pass a session to reuse a worker-owned connection/circuit; without
+    one, a fresh session is opened for this URL."""
+
+    headers = get_browser_headers(stream_id)
+
+    try:
+        if session is not None:
+            return await _scrape_with_session(session, url, stream_id, target_query, find_next, headers)
+
+        connector = get_proxy_connector(stream_id)
+        async with ClientSession(connector=connector, timeout=_SCRAPE_TIMEOUT) as session:
+            return await _scrape_with_session(session, url, stream_id, target_query, find_next, headers)
+
+    except asyncio.TimeoutError:
+        return url, ERROR_MESSAGES["timeout"], [], '', None
+    except Exception as e:
+        return url, sanitize_error(e), [], '', None
+
+
+async def _try_authenticated_scrape(url: str, stream_id: int, original_html: str, target_query: str = "") -> str:
+    """
+    attempt to authenticate and re-fetch a login-walled page.
+    if target_query is provided and the forum type is known, performs an
+    internal forum search instead of re-fetching the homepage.
+    returns the authenticated HTML on success, None on failure.
+    """
+    forum_session = get_forum_session()
+    
+    try:
+        auth_session, success = await forum_session.get_authenticated_session(url, stream_id + 1000)
+        
+        if success:
+            # detect forum type for potential internal search
+            forum_type = forum_session.detect_forum_type(original_html)
+
+            # try internal forum search if we have a query and known forum type
+            if target_query and forum_type != "generic":
+                search_html = await forum_session.search_forum(auth_session, url, target_query, forum_type)
+                if search_html and not is_login_wall(search_html):
+                    print(f"  [AUTH] Forum search returned results for {url[:45]}...")
+                    return search_html
+                else:
+                    print(f"  [AUTH] Forum search failed or still walled, falling back to page re-fetch")
+
+            # fallback: re-fetch the page with authenticated session
+            headers = get_browser_headers()
+            try:
+                async with auth_session.get(url, headers=headers) as resp:
+                    if resp.status == 200:
+                        html = await resp.text()
+                        # verify we're past the login wall
+                        if not is_login_wall(html):
+                            return html
+                        else:
+                            print(f"  [AUTH] Still behind login wall after authentication")
+                            return None
+            except Exception as e:
+                print(f"  [AUTH] Re-fetch failed: {str(e)[:60]}")
+                return None
+        
+        return None
+    except Exception as e:
+        print(f"  [AUTH] Authentication flow error: {str(e)[:60]}")
+        return None
+
+
+async def scrape_url_paginated(url: str, stream_id: int, max_pages: int = 1, target_query: str = "", session=None) -> tuple:
+    """scrape a URL and follow pagination links up to max_pages."""
+    # collect page texts and join once at the end — += on a growing
+    # string copies all earlier pages again for every page followed
+    page_texts = []
+    all_sublinks = []
+    raw_html = ""
+    current_url = url
+    visited_pages = set()
+
+    for page_num in range(max_pages):
+        if current_url in visited_pages:
+            break
+        visited_pages.add(current_url)
+
+        # with a shared session, pagination pages ride the worker's
+        # circuit; legacy callers still get a fresh circuit per page
+        sid = stream_id if session is not None else stream_id + page_num
+        result_url, text, sublinks, html, next_url = await scrape_url(
+            current_url, sid, target_query=target_query,
+            find_next=max_pages > 1, session=session,
+        )
+
+        if text.startswith("[ERROR"):
+            if page_num == 0:
+                return url, text, sublinks, html
+            break
+
+        page_texts.append(text)
+        all_sublinks.extend(sublinks)
+        if page_num == 0:
+            raw_html = html  # only cache first page HTML
+
+        # follow the pagination link detected during the scrape
+        if next_url and next_url not in visited_pages:
+            print(f"    [→] Following page {page_num + 2}: {next_url[:45]}...")
+            current_url = next_url
+        else:
+            break
+    
+    return url, "\n\n".join(page_texts), all_sublinks, raw_html
+
+
+def _extract_sublinks(parent_url: str, soup) -> list:
+    """extract same-domain sublinks from a page, capped at 5 per page to prevent bloat"""
+    # get base domain of parent
+    domain_match = re.search(r'https?://([a-z0-9\.]+\.onion)', parent_url)
+    if not domain_match:
+        return []
+    parent_domain = domain_match.group(1)
+    
+    sublinks = []
+    seen = set()
+    parent_clean = parent_url.rstrip('/')
+
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+
+        # resolve relative urls
+        if href.startswith('/'):
+            href = f"http://{parent_domain}{href}"
+
+        # only follow same-domain .onion links
+        if parent_domain not in href:
+            continue
+
+        if _is_skippable_link(href.lower()):
+            continue
+
+        clean = href.rstrip('/')
+        if clean not in seen and clean != parent_clean:
+            seen.add(clean)
+            sublinks.append(clean)
+        
+        if len(sublinks) >= 5:  # cap at 5 sublinks per page
+            break
+    
+    return sublinks
+
+
+# "next page" link texts, lowercased once here rather than rebuilt and
+# scanned as a list on every page
+_NEXT_PAGE_TEXTS = frozenset(['next', 'next page', '»', '›', '→', '>>'])
+
+
+def _detect_next_page(soup, current_url: str) -> str:
+    """detect pagination 'next page' link. returns URL or None."""
+    # method 1: rel="next" link
+    link = soup.find('a', rel='next')
+    if link and link.get('href'):
+        return urljoin(current_url, link['href'])
+
+    # method 2: link text patterns
+    for a in soup.find_all('a', href=True):
+        text = a.get_text(strip=True).lower()
+        if text in _NEXT_PAGE_TEXTS:
+            href = urljoin(current_url, a['href'])
+            if href != current_url:
+                return href
+    
+    # method 3: page number sequence (find current page, get next)
+    pagination = soup.find(['nav', 'div', 'ul'], class_=re.compile(r'pag', re.IGNORECASE))
+    if pagination:
+        links = pagination.find_all('a', href=True)
+        active = pagination.find(['span', 'strong', 'li'], class_=re.compile(r'active|current', re.IGNORECASE))
+        if active:
+            active_text = active.get_text(strip=True)
+            if active_text.isdigit():
+                next_num = str(int(active_text) + 1)
+                for a in links:
+                    if a.get_text(strip=True) == next_num:
+                        return urljoin(current_url, a['href'])
+    
+    return None
+
+
+def load_urls(filename: str = "output/results.txt") -> list:
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            urls = []
+            for line in f:
+                line = line.strip()
+                if line:
+                    # handle new format: "url | title"
+                    url = line.split(" | ")[0].strip()
+                    urls.append(url)
+        # drop duplicate lines up front, keeping first-seen order — the
+        # scraper's visited set would skip them anyway, but loaded counts
+        # and progress output shouldn't include repeats
+        return list(dict.fromkeys(urls))
+    except FileNotFoundError:
+        print(f"[-] File not found: {filename}")
+        return []
+
+
+async def scrape_all_async(urls: list, max_workers: int = 3, depth: int = 1, max_pages: int = 1, check_abort: callable = None, target_query: str = "") -> tuple:
+    """
+    scrape urls with optional depth control and pagination.
+    depth=1: landing page only (default, backward compatible)
+    depth=2: follow up to 5 sublinks per page (1 level deep)
+    max_pages: follow pagination up to N pages per URL (default: 1 = no pagination)
+    
+    loop protection:
+    - visited set prevents re-scraping same url
+    - same-domain only (no cross-site following)
+    - max 5 sublinks per page
+    - strict depth cap
+    
+    returns (scraped_data, html_cache) tuple
+    """
+    print(f"\n[+] Scraping {len(urls)} URLs with {max_workers} concurrent tasks...")
+    print(f"[+] Circuit isolation: ENABLED | Fail-fast connect: {int(_SCRAPE_TIMEOUT.sock_connect)}s")
+    print(f"[+] Depth: {depth} {'(sublinks enabled)' if depth > 1 else '(landing page only)'}")
+    if max_pages > 1:
+        print(f"[+] Pagination: up to {max_pages} pages per URL")
+    print()
+
+    visited = set()
+    results = {}
+    html_cache = {}
+
+    async def scrape_round(round_urls, base_stream, collect_sublinks):
+        """drain a url list with max_workers worker coroutines. each
+        worker owns one session (and Tor circuit) for every url it
+        pulls, so circuit setup is paid per worker instead of per url.
+        returns (sublinks, aborted)."""
+        queue = asyncio.Queue()
+        for u in round_urls:
+            queue.put_nowait(u)
+
+        round_sublinks = []
+        aborted = False
+
+        async def worker(worker_id):
+            nonlocal aborted
+            stream_id = base_stream + worker_id
+            connector = get_proxy_connector(stream_id)
+            async with ClientSession(connector=connector, timeout=_SCRAPE_TIMEOUT) as session:
+                while not aborted:
+                    if check_abort and check_abort():
+                        aborted = True
+                        return
+                    try:
+                        url = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        _, content, sublinks, raw_html = await scrape_url_paginated(
+                            url, stream_id, max_pages=max_pages,
+                            target_query=target_query, session=session,
+                        )
+                    except Exception as e:
+                        results[url] = f"[ERROR: {str(e)[:100]}]"
+                        continue
+                    results[url] = content
+                    if raw_html:
+                        html_cache[url] = raw_html
+                    if collect_sublinks and sublinks:
+                        round_sublinks.extend(sublinks)
+
+        num_workers = min(max_workers, len(round_urls))
+        await asyncio.gather(*(worker(i) for i in range(num_workers)))
+        return round_sublinks, aborted
+
+    # depth 1: scrape initial urls
+    initial_urls = []
+    for url in urls:
+        clean = url.rstrip('/')
+        if clean not in visited:
+            visited.add(clean)
+            initial_urls.append(url)
+
+    all_sublinks, aborted = await scrape_round(
+        initial_urls, base_stream=0, collect_sublinks=depth > 1)
+
+    if aborted:
+        print("\n  [!] Scraping aborted early. Saving partial results...")
+        _flush_login_walls()
+        return results, html_cache
+
+    # depth 2: follow sublinks (if depth > 1)
+    if depth > 1 and all_sublinks:
+        # one pass filters visited urls and intra-list duplicates —
+        # the list used to be scanned twice with rstrip run per scan
+        new_sublinks = []
+        for url in all_sublinks:
+            clean = url.rstrip('/')
+            if clean not in visited:
+                visited.add(clean)
+                new_sublinks.append(url)
+
+        if new_sublinks:
+            print(f"\n[+] Depth 2: following {len(new_sublinks)} sublinks...")
+
+            # fresh circuits for the second round's workers
+            _, aborted = await scrape_round(
+                new_sublinks, base_stream=max_workers, collect_sublinks=False)
+
+            if aborted:
+                print("\n  [!] Scraping aborted early. Saving partial results...")
+            else:
+                print(f"[+] Depth 2 complete: scraped {len(new_sublinks)} additional pages")
+
+    # cleanup forum sessions
+    try:
+        forum_session = get_forum_session()
+        await forum_session.close_all()
+    except Exception:
+        pass
+
+    _flush_login_walls()
+
+    return results, html_cache
+
+
+def scrape_all(urls: list, max_workers: int = 3, depth: int = 1, max_pages: int = 1, check_abort: callable = None, target_query: str = "") -> tuple:
+    """returns (scraped_data, html_cache) tuple"""
+    return asyncio.run(scrape_all_async(urls, max_workers, depth, max_pages=max_pages, check_abort=check_abort, target_query=target_query))
+
+
+def save_scraped_data(results: dict, filename: str = "output/scraped_data.txt"):
+    os.makedirs("output", exist_ok=True)
+    
+    # assemble the whole report in memory and flush it with one write
+    # instead of several small writes per page
+    parts = [
+        "## 🕸 Dark Web Scraped Data\n\n",
+        f"**{len(results)} pages scraped**\n\n",
+        "---\n\n",
+    ]
+    for i, (url, content) in enumerate(results.items(), 1):
+        parts.append(f"### [{i}] {url}\n\n")
+        # Truncate extremely long content for readability
+        display = content if len(content) <= 15000 else content[:15000] + "\n\n*... content truncated (full data preserved in raw scrape) ...*"
+        parts.append(display + "\n\n---\n\n")
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("".join(parts))
+
+    print(f"\n[+] Saved scraped data to {filename}")
+
+
+if __name__ == "__main__":
+    urls = load_urls()
+    if urls:
+        print(f"[+] Loaded {len(urls)} URLs from output/results.txt")
+        results = scrape_all(urls)
+        save_scraped_data(results)
+        
+        success = sum(1 for v in results.values() if not v.startswith("[ERROR"))
+        dead_links = sum(1 for v in results.values() if "Dead link" in v)
+        print(f"[+] Successfully scraped {success}/{len(urls)} pages")
+        print(f"[+] Dead links skipped: {dead_links}")
+    else:
+        print("[-] No URLs to scrape. Run search.py first.")
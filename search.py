@@ -1,214 +1,294 @@
-import os
-import asyncio
-import re
-from bs4 import BeautifulSoup
-from aiohttp import ClientSession, ClientTimeout
-
-from utils import get_browser_headers, get_proxy_connector, sanitize_error
-
-import functools
-print = functools.partial(print, flush=True)
-
-
-
-# dark web search engines
-SEARCH_ENGINES = [
-    "http://tordexu73joywapk2txdr54jed4imqledpcvcuf75qsas2gwdgksvnyd.onion/search?query={query}",
-    "http://tordexpmg4xy32rfp4ovnz7zq5ujoejwq2u26uxxtkscgo5u3losmeid.onion/search?query={query}",
-    "http://juhanurmihxlp77nkq76byazcldy2hlmovfu2epvl5ankdibsot4csyd.onion/search/?q={query}",
-    "http://zb2jtkhnbvhkya3d46twv3g7lkobi4s62tjffqmafjibixk6pmq75did.onion/gdark/search.php?query={query}&search=1",
-    "http://3bbad7fauom4d6sgppalyqddsqbf5u5p56b5k5uk2zxsy3d6ey2jobad.onion/search?q={query}",
-    "http://iy3544gmoeclh5de6gez2256v6pjh4omhpqdh2wpeeppjtvqmjhkfwad.onion/torgle/?query={query}",
-    "http://kaizerwfvp5gxu6cppibp7jhcqptavq3iqef66wbxenh6a2fklibdvid.onion/search?q={query}",
-    "http://anima4ffe27xmakwnseih3ic2y7y3l6e7fucwk4oerdn4odf7k74tbid.onion/search?q={query}",
-    "http://2fd6cemt4gmccflhm6imvdfvli3nf7zn6rfrwpsy7uhxrgbypvwf5fad.onion/search?query={query}",
-    "http://oniwayzz74cv2puhsgx4dpjwieww4wdphsydqvf5q7eyz4myjvyw26ad.onion/search.php?s={query}",
-    "http://tor66sewebgixwhcqfnp5inzp5x5uohhdy3kvtnyfxc2e5mxiuh34iid.onion/search?q={query}",
-    "http://3fzh7yuupdfyjhwt3ugzqqof6ulbcl27ecev33knxe3u7goi3vfn2qqd.onion/oss/index.php?search={query}",
-    "http://torgolnpeouim56dykfob6jh5r2ps2j73enc42s2um4ufob3ny4fcdyd.onion/?q={query}",
-    "http://justdirs5iebdkegiwbp3k6vwgwyr5mce7pztld23hlluy22ox4r3iad.onion/search/{query}",
-    "http://searchgf7gdtauh7bhnbyed4ivxqmuoat3nm6zfrg3ymkq6mtnpye3ad.onion/search?q={query}",
-    "http://torlbmqwtudkorme6prgfpmsnile7ug2zm4u3ejpcncxuhpu4k2j4kyd.onion/index.php?a=search&q={query}",
-    "http://toponiibv4eo4pctlszgavni5ajzg7uvkd7e2xslkjmtcfqesjlsqpid.onion/search.php?s={query}",
-]
-
-
-async def fetch_from_engine(endpoint: str, query: str, stream_id: int) -> list:
-    url = endpoint.format(query=query)
-    headers = get_browser_headers()
-    connector = get_proxy_connector(stream_id)
-    timeout = ClientTimeout(total=40)
-    
-    try:
-        print(f"  [*] Searching: {endpoint.split('/')[2][:20]}... (circuit {stream_id})")
-        
-        async with ClientSession(connector=connector, timeout=timeout) as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, "html.parser")
-                    links = []
-                    
-                    for a in soup.find_all('a'):
-                        try:
-                            href = a.get('href', '')
-                            title = a.get_text(strip=True)[:100]
-                            onion_links = re.findall(r'https?://[a-z0-9\.]+\.onion[^\s"\'<>]*', href)
-                            for link in onion_links:
-                                if "search" not in link and len(title) > 2:
-                                    links.append({"url": link, "title": title})
-                        except:
-                            continue
-                    
-                    print(f"  [+] Found {len(links)} links from {endpoint.split('/')[2][:20]}")
-                    return links
-                else:
-                    print(f"  [!] HTTP {response.status} from {endpoint.split('/')[2][:20]}")
-                    return []
-    except asyncio.TimeoutError:
-        print(f"  [!] Timeout: {endpoint.split('/')[2][:20]}")
-        return []
-    except Exception as e:
-        print(f"  [!] {sanitize_error(e)[:30]}")
-        return []
-
-
-async def search_dark_web_async(query: str, max_workers: int = 3, num_engines: int = None, check_abort: callable = None) -> list:
-    engines_to_use = SEARCH_ENGINES[:num_engines] if num_engines else SEARCH_ENGINES
-    
-    print(f"\n[+] Searching dark web for: '{query}'")
-    print(f"[+] Using {len(engines_to_use)}/{len(SEARCH_ENGINES)} search engines with {max_workers} concurrent tasks...")
-    print(f"[+] Circuit isolation: ENABLED\n")
-    
-    encoded_query = query.replace(" ", "+")
-    semaphore = asyncio.Semaphore(max_workers)
-    
-    async def limited_fetch(engine, stream_id):
-        if check_abort and check_abort():
-            raise InterruptedError("Aborted by user")
-        async with semaphore:
-            if check_abort and check_abort():
-                raise InterruptedError("Aborted by user")
-            return await fetch_from_engine(engine, encoded_query, stream_id)
-    
-    tasks = [
-        limited_fetch(engine, i)
-        for i, engine in enumerate(engines_to_use)
-    ]
-    
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # flatten and deduplicate by url
-    all_results = []
-    for result in results:
-        if isinstance(result, list):
-            all_results.extend(result)
-        elif isinstance(result, InterruptedError):
-            print("\n  [!] Search aborted early. Processing partial results...")
-            break
-    
-    seen = set()
-    unique_results = []
-    for item in all_results:
-        clean_url = item["url"].rstrip('/')
-        if clean_url not in seen:
-            seen.add(clean_url)
-            unique_results.append({"url": clean_url, "title": item["title"]})
-    
-    return unique_results
-
-
-def search_dark_web(query: str, max_workers: int = 3, num_engines: int = None, check_abort: callable = None) -> list:
-    return asyncio.run(search_dark_web_async(query, max_workers, num_engines, check_abort))
-
-
-def save_results(results: list, filename: str = "output/results.txt"):
-    os.makedirs("output", exist_ok=True)
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write("## 🔎 Search Results\n\n")
-        f.write(f"**{len(results)} results found**\n\n")
-        f.write("| # | Title | URL |\n")
-        f.write("|---|---|---|\n")
-        for i, item in enumerate(results, 1):
-            if isinstance(item, dict):
-                url = item['url'].replace("|", "\\|")
-                title = item.get('title', 'Untitled').replace("|", "\\|")
-                # Truncate very long titles
-                if len(title) > 80:
-                    title = title[:77] + "..."
-                f.write(f"| {i} | {title} | `{url}` |\n")
-            else:
-                f.write(f"| {i} | — | `{item}` |\n")
-    print(f"\n[+] Saved {len(results)} results to {filename}")
-
-
-def get_urls_from_results(results: list) -> list:
-    """extract plain url list from search results for scraper compatibility"""
-    if not results:
-        return []
-    if isinstance(results[0], dict):
-        return [item["url"] for item in results]
-    return results
-
-
-async def check_engines_async(max_workers: int = 5) -> dict:
-    """health-check all search engines. returns dict of url -> {status, response_time_ms}"""
-    import time as _time
-    
-    print(f"\n[+] Checking {len(SEARCH_ENGINES)} search engines...")
-    print(f"[+] Using Tor proxy at {TOR_PROXY_HOST}:{TOR_PROXY_PORT}\n")
-    
-    semaphore = asyncio.Semaphore(max_workers)
-    results = {}
-    
-    async def check_one(engine, stream_id):
-        async with semaphore:
-            url = engine.format(query="test")
-            domain = engine.split('/')[2][:25]
-            connector = get_proxy_connector(stream_id)
-            timeout = ClientTimeout(total=20)
-            headers = get_browser_headers()
-            
-            start = _time.time()
-            try:
-                async with ClientSession(connector=connector, timeout=timeout) as session:
-                    async with session.get(url, headers=headers) as response:
-                        elapsed = int((_time.time() - start) * 1000)
-                        status = "alive" if response.status == 200 else f"http_{response.status}"
-                        results[engine] = {"status": status, "ms": elapsed, "domain": domain}
-                        icon = "+" if status == "alive" else "!"
-                        print(f"  [{icon}] {domain:<25} {status:<10} {elapsed}ms")
-            except asyncio.TimeoutError:
-                elapsed = int((_time.time() - start) * 1000)
-                results[engine] = {"status": "timeout", "ms": elapsed, "domain": domain}
-                print(f"  [x] {domain:<25} timeout    {elapsed}ms")
-            except Exception:
-                elapsed = int((_time.time() - start) * 1000)
-                results[engine] = {"status": "dead", "ms": elapsed, "domain": domain}
-                print(f"  [x] {domain:<25} dead       {elapsed}ms")
-    
-    tasks = [check_one(engine, i) for i, engine in enumerate(SEARCH_ENGINES)]
-    await asyncio.gather(*tasks)
-    
-    # summary
-    alive = sum(1 for r in results.values() if r["status"] == "alive")
-    print(f"\n[+] Results: {alive}/{len(SEARCH_ENGINES)} engines alive")
-    return results
-
-
-def check_engines(max_workers: int = 5) -> dict:
-    return asyncio.run(check_engines_async(max_workers))
-
-
-if __name__ == "__main__":
-    query = input("Enter search query: ")
-    results = search_dark_web(query)
-    if results:
-        save_results(results)
-        print(f"\n[+] Found {len(results)} unique results")
-        for i, item in enumerate(results[:5], 1):
-            print(f"  {i}. {item['title'][:50]} — {item['url'][:50]}")
-        if len(results) > 5:
-            print(f"  ... and {len(results) - 5} more")
-    else:
-        print("\n[-] No results found. Check if Tor is running.")
+import os
+import asyncio
+import re
+from bs4 import BeautifulSoup
+from aiohttp import ClientSession, ClientTimeout
+
+from utils import (
+    get_browser_headers, get_proxy_connector, sanitize_error, BS_PARSER,
+    TOR_PROXY_HOST, TOR_PROXY_PORT,
+)
+
+import functools
+print = functools.partial(print, flush=True)
+
+
+
+# dark web search engines
+SEARCH_ENGINES = [
+    "http://tordexu73joywapk2txdr54jed4imqledpcvcuf75qsas2gwdgksvnyd.onion/search?query={query}",
+    "http://tordexpmg4xy32rfp4ovnz7zq5ujoejwq2u26uxxtkscgo5u3losmeid.onion/search?query={query}",
+    "http://juhanurmihxlp77nkq76byazcldy2hlmovfu2epvl5ankdibsot4csyd.onion/search/?q={query}",
+    "http://zb2jtkhnbvhkya3d46twv3g7lkobi4s62tjffqmafjibixk6pmq75did.onion/gdark/search.php?query={query}&search=1",
+    "http://3bbad7fauom4d6sgppalyqddsqbf5u5p56b5k5uk2zxsy3d6ey2jobad.onion/search?q={query}",
+    "http://iy3544gmoeclh5de6gez2256v6pjh4omhpqdh2wpeeppjtvqmjhkfwad.onion/torgle/?query={query}",
+    "http://kaizerwfvp5gxu6cppibp7jhcqptavq3iqef66wbxenh6a2fklibdvid.onion/search?q={query}",
+    "http://anima4ffe27xmakwnseih3ic2y7y3l6e7fucwk4oerdn4odf7k74tbid.onion/search?q={query}",
+    "http://2fd6cemt4gmccflhm6imvdfvli3nf7zn6rfrwpsy7uhxrgbypvwf5fad.onion/search?query={query}",
+    "http://oniwayzz74cv2puhsgx4dpjwieww4wdphsydqvf5q7eyz4myjvyw26ad.onion/search.php?s={query}",
+    "http://tor66sewebgixwhcqfnp5inzp5x5uohhdy3kvtnyfxc2e5mxiuh34iid.onion/search?q={query}",
+    "http://3fzh7yuupdfyjhwt3ugzqqof6ulbcl27ecev33knxe3u7goi3vfn2qqd.onion/oss/index.php?search={query}",
+    "http://torgolnpeouim56dykfob6jh5r2ps2j73enc42s2um4ufob3ny4fcdyd.onion/?q={query}",
+    "http://justdirs5iebdkegiwbp3k6vwgwyr5mce7pztld23hlluy22ox4r3iad.onion/search/{query}",
+    "http://searchgf7gdtauh7bhnbyed4ivxqmuoat3nm6zfrg3ymkq6mtnpye3ad.onion/search?q={query}",
+    "http://torlbmqwtudkorme6prgfpmsnile7ug2zm4u3ejpcncxuhpu4k2j4kyd.onion/index.php?a=search&q={query}",
+    "http://toponiibv4eo4pctlszgavni5ajzg7uvkd7e2xslkjmtcfqesjlsqpid.onion/search.php?s={query}",
+]
+
+
+async def _fetch_engine_page(session, endpoint: str, url: str, headers: dict) -> list:
+    async with session.get(url, headers=headers) as response:
+        if response.status == 200:
+            html = await response.text()
+            soup = BeautifulSoup(html, BS_PARSER)
+            links = []
+
+            for a in soup.find_all('a'):
+                try:
+                    href = a.get('href', '')
+                    title = a.get_text(strip=True)[:100]
+                    onion_links = re.findall(r'https?://[a-z0-9\.]+\.onion[^\s"\'<>]*', href)
+                    for link in onion_links:
+                        if "search" not in link and len(title) > 2:
+                            links.append({"url": link, "title": title})
+                except:
+                    continue
+
+            print(f"  [+] Found {len(links)} links from {endpoint.split('/')[2][:20]}")
+            return links
+        else:
+            print(f"  [!] HTTP {response.status} from {endpoint.split('/')[2][:20]}")
+            return []
+
+
+async def fetch_from_engine(endpoint: str, query: str, stream_id: int, session=None) -> list:
+    """fetch one engine's results page. pass an existing session to reuse
+    its Tor circuit across calls instead of rebuilding one per fetch."""
+    url = endpoint.format(query=query)
+    headers = get_browser_headers(stream_id)
+
+    try:
+        print(f"  [*] Searching: {endpoint.split('/')[2][:20]}... (circuit {stream_id})")
+
+        if session is not None:
+            return await _fetch_engine_page(session, endpoint, url, headers)
+
+        connector = get_proxy_connector(stream_id)
+        timeout = ClientTimeout(total=40)
+        async with ClientSession(connector=connector, timeout=timeout) as session:
+            return await _fetch_engine_page(session, endpoint, url, headers)
+    except asyncio.TimeoutError:
+        print(f"  [!] Timeout: {endpoint.split('/')[2][:20]}")
+        return []
+    except Exception as e:
+        print(f"  [!] {sanitize_error(e)[:30]}")
+        return []
+
+
+async def search_dark_web_async(query: str, max_workers: int = 3, num_engines: int = None, check_abort: callable = None) -> list:
+    engines_to_use = SEARCH_ENGINES[:num_engines] if num_engines else SEARCH_ENGINES
+    
+    print(f"\n[+] Searching dark web for: '{query}'")
+    print(f"[+] Using {len(engines_to_use)}/{len(SEARCH_ENGINES)} search engines with {max_workers} concurrent tasks...")
+    print(f"[+] Circuit isolation: ENABLED\n")
+    
+    encoded_query = query.replace(" ", "+")
+    semaphore = asyncio.Semaphore(max_workers)
+    
+    async def limited_fetch(engine, stream_id):
+        if check_abort and check_abort():
+            raise InterruptedError("Aborted by user")
+        async with semaphore:
+            if check_abort and check_abort():
+                raise InterruptedError("Aborted by user")
+            return await fetch_from_engine(engine, encoded_query, stream_id)
+    
+    tasks = [
+        limited_fetch(engine, i)
+        for i, engine in enumerate(engines_to_use)
+    ]
+    
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    # flatten and deduplicate by url
+    all_results = []
+    for result in results:
+        if isinstance(result, list):
+            all_results.extend(result)
+        elif isinstance(result, InterruptedError):
+            print("\n  [!] Search aborted early. Processing partial results...")
+            break
+    
+    seen = set()
+    unique_results = []
+    for item in all_results:
+        clean_url = item["url"].rstrip('/')
+        if clean_url not in seen:
+            seen.add(clean_url)
+            unique_results.append({"url": clean_url, "title": item["title"]})
+    
+    return unique_results
+
+
+def search_dark_web(query: str, max_workers: int = 3, num_engines: int = None, check_abort: callable = None) -> list:
+    return asyncio.run(search_dark_web_async(query, max_workers, num_engines, check_abort))
+
+
+async def search_dark_web_multi_async(queries: list, max_workers: int = 3, num_engines: int = None, check_abort: callable = None) -> dict:
+    """
+    search several queries in one event loop. fetches are grouped per
+    engine: engines run concurrently (bounded by the shared semaphore),
+    but each engine sees its queries one at a time with a pause between
+    them — same per-engine pacing as serial query rounds, without every
+    engine idling while the slowest one finishes a round.
+    returns {query: [results]} with per-query dedup, in input order.
+    """
+    engines_to_use = SEARCH_ENGINES[:num_engines] if num_engines else SEARCH_ENGINES
+
+    print(f"\n[+] Searching dark web for {len(queries)} queries")
+    print(f"[+] Using {len(engines_to_use)}/{len(SEARCH_ENGINES)} search engines with {max_workers} concurrent tasks...")
+    print(f"[+] Circuit isolation: ENABLED\n")
+
+    semaphore = asyncio.Semaphore(max_workers)
+    per_query = {q: [] for q in queries}
+
+    async def engine_rounds(engine, stream_id):
+        # one session per engine for the whole run — repeat query rounds
+        # reuse the same Tor circuit and connection instead of paying a
+        # fresh circuit build per fetch
+        connector = get_proxy_connector(stream_id)
+        timeout = ClientTimeout(total=40)
+        async with ClientSession(connector=connector, timeout=timeout) as session:
+            for qi, q in enumerate(queries):
+                if check_abort and check_abort():
+                    raise InterruptedError("Aborted by user")
+                if qi:
+                    # rate limit: pace repeat hits on the same engine
+                    await asyncio.sleep(3)
+                async with semaphore:
+                    if check_abort and check_abort():
+                        raise InterruptedError("Aborted by user")
+                    links = await fetch_from_engine(engine, q.replace(" ", "+"), stream_id, session=session)
+                per_query[q].extend(links)
+
+    tasks = [engine_rounds(engine, i) for i, engine in enumerate(engines_to_use)]
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    if any(isinstance(o, InterruptedError) for o in outcomes):
+        print("\n  [!] Search aborted early. Processing partial results...")
+
+    # dedup within each query, same as the single-query path
+    batches = {}
+    for q in queries:
+        seen = set()
+        unique = []
+        for item in per_query[q]:
+            clean_url = item["url"].rstrip('/')
+            if clean_url not in seen:
+                seen.add(clean_url)
+                unique.append({"url": clean_url, "title": item["title"]})
+        batches[q] = unique
+
+    return batches
+
+
+def search_dark_web_multi(queries: list, max_workers: int = 3, num_engines: int = None, check_abort: callable = None) -> dict:
+    return asyncio.run(search_dark_web_multi_async(queries, max_workers, num_engines, check_abort))
+
+
+def save_results(results: list, filename: str = "output/results.txt"):
+    os.makedirs("output", exist_ok=True)
+
+    # assemble the whole report in memory and flush it with one write
+    # instead of one small write (and syscall) per result row
+    lines = [
+        "## 🔎 Search Results\n\n",
+        f"**{len(results)} results found**\n\n",
+        "| # | Title | URL |\n",
+        "|---|---|---|\n",
+    ]
+    for i, item in enumerate(results, 1):
+        if isinstance(item, dict):
+            url = item['url'].replace("|", "\\|")
+            title = item.get('title', 'Untitled').replace("|", "\\|")
+            # Truncate very long titles
+            if len(title) > 80:
+                title = title[:77] + "..."
+            lines.append(f"| {i} | {title} | `{url}` |\n")
+        else:
+            lines.append(f"| {i} | — | `{item}` |\n")
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+    print(f"\n[+] Saved {len(results)} results to {filename}")
+
+
+def get_urls_from_results(results: list) -> list:
+    """extract plain url list from search results for scraper compatibility"""
+    if not results:
+        return []
+    if isinstance(results[0], dict):
+        return [item["url"] for item in results]
+    return results
+
+
+async def check_engines_async(max_workers: int = 5) -> dict:
+    """health-check all search engines. returns dict of url -> {status, response_time_ms}"""
+    import time as _time
+    
+    print(f"\n[+] Checking {len(SEARCH_ENGINES)} search engines...")
+    print(f"[+] Using Tor proxy at {TOR_PROXY_HOST}:{TOR_PROXY_PORT}\n")
+    
+    semaphore = asyncio.Semaphore(max_workers)
+    results = {}
+    
+    async def check_one(engine, stream_id):
+        async with semaphore:
+            url = engine.format(query="test")
+            domain = engine.split('/')[2][:25]
+            connector = get_proxy_connector(stream_id)
+            timeout = ClientTimeout(total=20)
+            headers = get_browser_headers()
+            
+            start = _time.time()
+            try:
+                async with ClientSession(connector=connector, timeout=timeout) as session:
+                    async with session.get(url, headers=headers) as response:
+                        elapsed = int((_time.time() - start) * 1000)
+                        status = "alive" if response.status == 200 else f"http_{response.status}"
+                        results[engine] = {"status": status, "ms": elapsed, "domain": domain}
+                        icon = "+" if status == "alive" else "!"
+                        print(f"  [{icon}] {domain:<25} {status:<10} {elapsed}ms")
+            except asyncio.TimeoutError:
+                elapsed = int((_time.time() - start) * 1000)
+                results[engine] = {"status": "timeout", "ms": elapsed, "domain": domain}
+                print(f"  [x] {domain:<25} timeout    {elapsed}ms")
+            except Exception:
+                elapsed = int((_time.time() - start) * 1000)
+                results[engine] = {"status": "dead", "ms": elapsed, "domain": domain}
+                print(f"  [x] {domain:<25} dead       {elapsed}ms")
+    
+    tasks = [check_one(engine, i) for i, engine in enumerate(SEARCH_ENGINES)]
+    await asyncio.gather(*tasks)
+    
+    # summary
+    alive = sum(1 for r in results.values() if r["status"] == "alive")
+    print(f"\n[+] Results: {alive}/{len(SEARCH_ENGINES)} engines alive")
+    return results
+
+
+def check_engines(max_workers: int = 5) -> dict:
+    return asyncio.run(check_engines_async(max_workers))
+
+
+if __name__ == "__main__":
+    query = input("Enter search query: ")
+    results = search_dark_web(query)
+    if results:
+        save_results(results)
+        print(f"\n[+] Found {len(results)} unique results")
+        for i, item in enumerate(results[:5], 1):
+            print(f"  {i}. {item['title'][:50]} — {item['url'][:50]}")
+        if len(results) > 5:
+            print(f"  ... and {len(results) - 5} more")
+    else:
+        print("\n[-] No results found. Check if Tor is running.")
@@ -6,6 +6,9 @@ proxy connectors, error handling, and common boilerplate.
 
 import os
 import random
+import asyncio
+
+import aiohttp
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -16,6 +19,19 @@ import functools
 print = functools.partial(print, flush=True)
 
 
+# ============================================================
+# HTML PARSER SELECTION
+# ============================================================
+
+# prefer the lxml C parser for BeautifulSoup when installed (several
+# times faster on large pages); fall back to the stdlib parser
+try:
+    import lxml  # noqa: F401
+    BS_PARSER = "lxml"
+except ImportError:
+    BS_PARSER = "html.parser"
+
+
 # ============================================================
 # TOR PROXY CONFIG
 # ============================================================
@@ -66,9 +82,23 @@ BROWSER_PROFILES = [
 ]
 
 
-def get_browser_headers() -> dict:
-    """return a random browser profile for fingerprint rotation."""
-    return random.choice(BROWSER_PROFILES).copy()
+# one profile pinned per circuit — a real browser doesn't swap its
+# fingerprint between requests on the same connection, and rotating
+# per request made repeat hits on a host trivially linkable as a bot
+_HEADERS_BY_STREAM = {}
+
+
+def get_browser_headers(stream_id: int = None) -> dict:
+    """return a browser profile for fingerprinting. pass a stream_id to
+    pin one profile to that circuit for its lifetime; without one, a
+    random profile is picked per call."""
+    if stream_id is None:
+        return random.choice(BROWSER_PROFILES).copy()
+    profile = _HEADERS_BY_STREAM.get(stream_id)
+    if profile is None:
+        profile = _HEADERS_BY_STREAM.setdefault(stream_id, random.choice(BROWSER_PROFILES))
+    # copy so callers can add per-request headers (e.g. Range) safely
+    return profile.copy()
 
 
 # ============================================================
@@ -78,9 +108,14 @@ def get_browser_headers() -> dict:
 def get_proxy_connector(stream_id: int):
     """create a SOCKS5 proxy connector with tor circuit isolation."""
     from aiohttp_socks import ProxyConnector
+    # ssl=False: everything through this connector is a .onion hidden
+    # service, whose address already authenticates the endpoint. their
+    # HTTPS certs are self-signed as a rule, so cert validation only
+    # ever failed otherwise-fine fetches
     return ProxyConnector.from_url(
         f"socks5://stream{stream_id}:x@{TOR_PROXY_HOST}:{TOR_PROXY_PORT}",
-        rdns=True
+        rdns=True,
+        ssl=False,
     )
 
 
@@ -101,6 +136,19 @@ ERROR_MESSAGES = {
 
 def sanitize_error(exception: Exception) -> str:
     """convert exception to a safe error message without leaking internals."""
+    # type dispatch first — the common aiohttp/asyncio failures are
+    # classified without stringifying the exception or scanning its text
+    if isinstance(exception, asyncio.TimeoutError):
+        return ERROR_MESSAGES["timeout"]
+    if isinstance(exception, aiohttp.ClientConnectionError):
+        return ERROR_MESSAGES["connection"]
+    if isinstance(exception, aiohttp.ClientResponseError):
+        return ERROR_MESSAGES["http"]
+    if isinstance(exception, aiohttp.ClientPayloadError):
+        return ERROR_MESSAGES["parse"]
+
+    # fall back to message sniffing for errors that only identify
+    # themselves in text (SOCKS proxy failures, stdlib OSErrors, ...)
     error_str = str(exception).lower()
     if "timeout" in error_str:
         return ERROR_MESSAGES["timeout"]